@@ -0,0 +1,45 @@
+import argparse
+import sys
+
+import numpy as np
+
+from physice import EmitterSystem, World
+
+# 细节层次 (LOD) 步进在物体持续生成和回收时的检查：
+# 视野外铺满静态背景物体，另有一个视野外的发射器每步都生成和回收物体，
+# 每步检查所有物体的 last_update 落后 time_elapsed 不超过 lod_interval 步，
+# 即后台轮转不会因为物体编号变化而停住。不满足时以非零状态退出。
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PhysicE 细节层次步进检查")
+    parser.add_argument("--bodies", type=int, default=20000, help="背景物体数")
+    parser.add_argument("--rate", type=float, default=600.0, help="发射器每秒生成的物体数")
+    parser.add_argument("--lifetime", type=float, default=0.05, help="发射物体的寿命（秒）")
+    parser.add_argument("--interval", type=int, default=8, help="细节层次的更新间隔 lod_interval")
+    parser.add_argument("--steps", type=int, default=240, help="步数")
+    parser.add_argument("--dt", type=float, default=1 / 60, help="时间步长（秒）")
+    args = parser.parse_args()
+
+    width = 2000.0
+    world = World(capacity=args.bodies + 1024, width=width)
+    rng = np.random.default_rng(0)
+    world.add_bodies(rng.uniform((0.0, 0.0), (width, 100.0), (args.bodies, 2)), radius=0.5)
+    emitters = EmitterSystem(capacity=max(int(args.rate * args.lifetime * 2) + 64, 64), seed=1)
+    emitters.add_emitter((width - 100.0, 5.0), args.rate, velocity=(0.0, 20.0), lifetime=args.lifetime)
+    emitters.attach(world)
+    world.set_view((0.0, 0.0), (100.0, 100.0), interval=args.interval)
+
+    worst = 0.0
+    for _ in range(args.steps):
+        world.step(args.dt)
+        n = world.count
+        worst = max(worst, float((world.time_elapsed - world.last_update[:n]).max()) / args.dt)
+    ok = worst <= args.interval + 1e-6
+    print(f"{args.steps} 步后 {world.count} 个物体，最多落后 {worst:.2f} 步"
+          f"（lod_interval = {args.interval}）：{'通过' if ok else '失败'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
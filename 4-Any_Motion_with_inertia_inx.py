@@ -4,6 +4,9 @@ import pygame
 import sys
 from pygame.locals import *
 
+from physice import AsyncLogWriter, EventStream, ThrowVelocityEstimator
+from physice.events import CONTACT, RELEASE
+
 # 物理常量定义
 GRAVITY = 9.8  # 重力加速度，单位：m/s²
 REBOUND_COEFFICIENT = 1  # 反弹系数，值越小反弹高度越低
@@ -15,7 +18,9 @@ GROUND_Y = SCREEN_HEIGHT - 50  # 地面位置
 ball_radius = 20  # 小球半径
 SCALE_FACTOR = 3  # 缩放因子，将米转换为像素
 
-# 为什么有时候惯性有效有时候惯性无效呢？
+# 抛出惯性常量
+THROW_GAIN = 1.8  # 速度增益
+MAX_THROW_VELOCITY = 120.0  # 最大抛出速度
 
 class FreeFallSimulator:
     def __init__(self):
@@ -47,14 +52,12 @@ class FreeFallSimulator:
         self.drag_offset_x = 0  # 拖动时鼠标与球中心的X偏移
         self.drag_offset_y = 0  # 拖动时鼠标与球中心的Y偏移
         
-        # 优化：记录鼠标轨迹用于瞬时速度计算
-        self.mouse_trajectory = []  # 存储最近的鼠标位置 [(x1,y1,t1), (x2,y2,t2), ...]
-        self.trajectory_max_length = 5  # 最多记录5个点
-        
-        # 新增拖动惯性相关变量
-        self.last_mouse_x = 0
-        self.last_mouse_y = 0
-        self.last_mouse_time = 0
+        # 优化：用固定大小的环形缓冲区记录鼠标轨迹，松开时拟合出唯一的抛出速度
+        self.throw_estimator = ThrowVelocityEstimator()
+
+        # 事件流：模拟线程只记录反弹事件，格式化和打印在后台线程完成
+        self.events = EventStream(batch_capacity=64)
+        AsyncLogWriter(self.events, kinds={CONTACT}, formatter=self.format_rebound)
         
         # 控制变量
         self.running = True
@@ -114,7 +117,7 @@ class FreeFallSimulator:
                         self.time_elapsed = 0.0
                 elif event.button == 1:  # 左键点击
                     # 检查是否点击到球
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
+                    mouse_x, mouse_y = event.pos
                     ball_y = GROUND_Y - ball_radius - (self.current_height * SCALE_FACTOR)
                     # 计算鼠标与球中心的距离
                     distance = ((mouse_x - self.ball_x)**2 + (mouse_y - ball_y)** 2)**0.5
@@ -123,17 +126,12 @@ class FreeFallSimulator:
                         # 计算偏移量
                         self.drag_offset_x = self.ball_x - mouse_x
                         self.drag_offset_y = ball_y - mouse_y
-                        # 简化：初始化轨迹记录
-                        self.mouse_trajectory = [(mouse_x, mouse_y, pygame.time.get_ticks())]
-                        self.last_mouse_x = mouse_x
-                        self.last_mouse_y = mouse_y
-                        self.last_mouse_time = pygame.time.get_ticks()
-                        print("last_mouse_time")
-                        print( self.last_mouse_time)
+                        # 初始化轨迹记录
+                        self.throw_estimator.reset(mouse_x, mouse_y, pygame.time.get_ticks())
             elif event.type == MOUSEMOTION:
                 # 拖动球
                 if self.dragging:
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
+                    mouse_x, mouse_y = event.pos
                     current_time = pygame.time.get_ticks()
                     with self.lock:
                         # 更新球的位置
@@ -144,70 +142,35 @@ class FreeFallSimulator:
                         # 拖动时仅暂停垂直重力，保留水平速度计算
                         self.velocity = 0.0
                         self.falling = False  # 拖动时停止下落
-                    # 记录鼠标轨迹（仅保留最近5个点）
-                    self.mouse_trajectory.append((mouse_x, mouse_y, current_time))
-                    if len(self.mouse_trajectory) > self.trajectory_max_length:
-                        self.mouse_trajectory.pop(0)
-                    # 仅更新鼠标位置，不更新时间戳
-                    self.last_mouse_x = mouse_x
-                    self.last_mouse_y = mouse_y
-                    # 移除这行：self.last_mouse_time = pygame.time.get_ticks()
-                    # 小球有时候不会弹的原因是mouseDown是一直在执行的
+                    # 记录鼠标轨迹（同一帧内被合并的事件只保留最新位置）
+                    self.throw_estimator.push(mouse_x, mouse_y, current_time)
             elif event.type == MOUSEBUTTONUP:
                 if event.button == 1 and self.dragging:
                     # 结束拖动
                     self.dragging = False
-                    # 优化：使用最后两个轨迹点计算瞬时速度
-                    if len(self.mouse_trajectory) >= 2:
-                        # 获取最后两个有效轨迹点
-                        (x1, y1, t1), (x2, y2, t2) = self.mouse_trajectory[-2], self.mouse_trajectory[-1]
-                        time_diff = t2 - t1
-                        if time_diff > 5:  # 最小时间差阈值
-                            dx = x2 - x1
-                            dy = y2 - y1
-                            # 计算瞬时速度（像素/毫秒）
-                            mouse_velocity_x = dx / time_diff
-                            mouse_velocity_y = dy / time_diff
-                            
-                            # 物理参数调整
-                            scale = 1200.0 / SCALE_FACTOR  # 缩放因子
-                            gain = 1.8  # 速度增益
-                            max_velocity = 120.0  # 最大速度限制
-                            
-                            # 应用速度
-                            self.horizontal_velocity = mouse_velocity_x * scale * gain
-                            self.velocity = mouse_velocity_y * scale * gain
-                            
-                            # 速度限制
-                            self.horizontal_velocity = max(-max_velocity, min(self.horizontal_velocity, max_velocity))
-                            self.velocity = max(-max_velocity, min(self.velocity, max_velocity))
-                    # 清空轨迹记录
-                    self.mouse_trajectory.clear()
+                    # 松开位置也作为一个采样点，然后对最近的轨迹做加权拟合
                     current_time = pygame.time.get_ticks()
-                    # 使用拖动开始时的时间计算总时长
-                    time_diff = current_time - self.last_mouse_time  # 现在这是拖动开始时的时间
-                    print(f"拖动总时长: {time_diff}ms")
-                    if time_diff > 10:  # 忽略极短时间拖动（<10ms）
-                        # 获取当前鼠标位置
-                        mouse_x, mouse_y = pygame.mouse.get_pos()
-                        # 计算鼠标移动距离（从拖动开始到结束）
-                        dx = mouse_x - self.last_mouse_x
-                        dy = mouse_y - self.last_mouse_y
-                        
-                        # 计算鼠标速度 (像素/毫秒) 并增加增益系数
-                        mouse_velocity_x = dx / time_diff
-                        mouse_velocity_y = dy / time_diff
-                        
-                        # 调整缩放因子和增益，增强惯性效果
-                        scale = 1500.0 / SCALE_FACTOR  # 增加缩放比例
-                        gain = 1.5  # 新增速度增益系数
-                        self.horizontal_velocity = mouse_velocity_x * scale * gain
-                        self.velocity = mouse_velocity_y * scale * gain  # 正值表示向下
-                        
-                        # 调整最大速度限制
-                        max_velocity = 90.0  # 提高最大速度
-                        self.horizontal_velocity = max(-max_velocity, min(self.horizontal_velocity, max_velocity))
-                        self.velocity = max(-max_velocity, min(self.velocity, max_velocity))
+                    self.throw_estimator.push(event.pos[0], event.pos[1], current_time)
+                    # 拟合得到的速度单位是像素/毫秒，换算成 m/s
+                    mouse_velocity_x, mouse_velocity_y = self.throw_estimator.estimate(current_time)
+                    scale = 1000.0 / SCALE_FACTOR
+                    vx = mouse_velocity_x * scale * THROW_GAIN
+                    vy = mouse_velocity_y * scale * THROW_GAIN  # 屏幕坐标，正值表示向下
+                    vx = max(-MAX_THROW_VELOCITY, min(vx, MAX_THROW_VELOCITY))
+                    vy = max(-MAX_THROW_VELOCITY, min(vy, MAX_THROW_VELOCITY))
+                    with self.lock:
+                        self.horizontal_velocity = vx
+                        # velocity 只存速率，方向由 falling 表示；
+                        # 之前向上抛出时 velocity 为负，会被模拟循环直接清零，导致“惯性无效”
+                        self.falling = vy >= 0
+                        self.velocity = abs(vy)
+                        self.events.emit(RELEASE, 0, self.time_elapsed, (vx * vx + vy * vy) ** 0.5,
+                                         self.ball_x, self.current_height)
+                    self.throw_estimator.reset()
+
+    def format_rebound(self, event):
+        """反弹事件的日志格式，在事件分发线程中调用"""
+        return f"反弹 t={event['time']:.1f}s 触地速度 {event['speed']:.2f} m/s"
 
     def simulation_loop(self):
         """物理模拟主循环"""
@@ -231,13 +194,14 @@ class FreeFallSimulator:
                     if self.current_height <= 0:
                         self.current_height = 0
                         self.falling = False
+                        impact_velocity = self.velocity
                         # 计算垂直反弹速度
                         self.velocity = abs(self.velocity) * REBOUND_COEFFICIENT
                         # 添加最小反弹速度阈值，避免无限小反弹
                         if self.velocity < 0.5:
                             self.velocity = 0
                         self.rebound_count += 1
-                        print(f"反弹 {self.rebound_count} 次")
+                        self.events.emit(CONTACT, 0, self.time_elapsed, impact_velocity, self.ball_x, 0.0)
 
                     # 当上升速度减为0时，开始下落
                     if not self.falling and self.velocity <= 0:
@@ -258,6 +222,7 @@ class FreeFallSimulator:
                         self.horizontal_velocity = -abs(self.horizontal_velocity) * self.horizontal_rebound_coefficient
 
                     self.time_elapsed += self.time_step
+                    self.events.commit()
 
             # 控制模拟速度
             time.sleep(self.time_step)
@@ -282,12 +247,13 @@ class FreeFallSimulator:
             self.screen.blit(ball_info, info_rect)
             
             # 绘制鼠标拖动轨迹
-            if self.dragging and len(self.mouse_trajectory) > 1:
+            if self.dragging and len(self.throw_estimator) > 1:
+                trajectory = list(self.throw_estimator.points())[-5:]
                 # 绘制轨迹线
                 pygame.draw.lines(self.screen, (100, 200, 255), False, 
-                                 [(x, y) for x, y, t in self.mouse_trajectory], 2)
+                                 [(x, y) for x, y, t in trajectory], 2)
                 # 绘制轨迹点，最近的点更大更亮
-                for i, (x, y, t) in enumerate(self.mouse_trajectory):
+                for i, (x, y, t) in enumerate(trajectory):
                     size = 3 + i * 2  # 轨迹点逐渐变大
                     alpha = 100 + i * 30  # 轨迹点逐渐变亮
                     # 创建带透明度的颜色
@@ -0,0 +1,322 @@
+import time
+import threading
+import pygame
+import sys
+from pygame.locals import *
+
+from physice import (
+    ContactSolver,
+    Diagnostics,
+    EmitterSystem,
+    LinearDrag,
+    PointAttractor,
+    QuadraticDrag,
+    SoftBodySet,
+    SpringSet,
+    StaticGeometry,
+    ThrowVelocityEstimator,
+    TurbulentWind,
+    UniformWind,
+    World,
+)
+
+# 图形界面常量
+SCREEN_WIDTH = 800  # 窗口宽度
+SCREEN_HEIGHT = 600  # 窗口高度
+GROUND_Y = SCREEN_HEIGHT - 50  # 地面位置
+ball_radius = 20  # 小球半径（像素）
+SCALE_FACTOR = 3  # 缩放因子，将米转换为像素
+
+# 抛出惯性常量
+THROW_GAIN = 1.8  # 速度增益
+MAX_THROW_VELOCITY = 120.0  # 最大抛出速度
+
+TRACE_PATH = "trace.csv"  # 按 E 导出能量/动量轨迹的文件
+
+
+def to_screen(x, y):
+    """世界坐标（米，y 向上）转换为屏幕坐标（像素，y 向下）"""
+    return x * SCALE_FACTOR, GROUND_Y - y * SCALE_FACTOR
+
+
+def to_world(sx, sy):
+    """屏幕坐标转换为世界坐标"""
+    return sx / SCALE_FACTOR, (GROUND_Y - sy) / SCALE_FACTOR
+
+
+class FreeFallSimulator:
+    def __init__(self):
+        # 初始化Pygame
+        pygame.init()
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("多物体力场模拟")
+        self.clock = pygame.time.Clock()
+        self.font = pygame.font.SysFont("SimHei", 24)
+        self.small_font = pygame.font.SysFont("SimHei", 18)
+
+        # 物理世界
+        self.world = World(width=SCREEN_WIDTH / SCALE_FACTOR)
+        self.time_step = 0.02  # 默认时间步长
+
+        # 力场：默认关闭，用数字键切换
+        self.springs = SpringSet()
+        self.fields = {
+            K_1: LinearDrag(0.05),
+            K_2: QuadraticDrag(),
+            K_3: UniformWind((8.0, 0.0), zone=(0.0, 0.0, self.world.width / 2, 200.0)),
+            K_4: TurbulentWind((0.0, 0.0), amplitude=6.0),
+            K_5: PointAttractor((self.world.width / 2, 100.0), strength=2000.0),
+        }
+        for field in self.fields.values():
+            field.enabled = False
+        self.world.force_fields.extend(self.fields.values())
+        self.world.force_fields.append(self.springs)
+
+        # 静态碰撞体：左侧坡道和右侧平台
+        self.geometry = StaticGeometry()
+        self.geometry.add_segments([(10.0, 90.0)], [(110.0, 40.0)])
+        self.geometry.add_polygon([(170.0, 60.0), (240.0, 60.0), (240.0, 66.0), (170.0, 66.0)])
+        self.world.static_geometry = self.geometry
+
+        # 软体：J 投下果冻球，K 挂一块布料
+        self.soft_bodies = SoftBodySet()
+        self.world.soft_bodies = self.soft_bodies
+
+        # 喷泉发射器：F 开关，小球 10 秒后回收，落入右下角的回收区立即回收
+        self.emitters = EmitterSystem(capacity=2000).attach(self.world)
+        self.fountain = self.emitters.add_emitter((20.0, 5.0), rate=60.0, velocity=(15.0, 40.0), spread=3.0,
+                                                  radius=1.5, lifetime=10.0)
+        self.fountain.enabled = False
+        self.emitters.add_despawn_zone((self.world.width - 20.0, 0.0, self.world.width, 10.0))
+
+        # 小球之间的接触求解器，按 C 开关
+        self.contact_solver = ContactSolver()
+
+        # 能量与动量诊断
+        self.diagnostics = Diagnostics()
+        self.world.diagnostics = self.diagnostics
+
+        # 拖动状态
+        self.dragging = None  # 正在拖动的物体索引
+        self.drag_mass = 1.0  # 被拖动物体原来的质量，松开时恢复
+        self.drag_offset_x = 0.0
+        self.drag_offset_y = 0.0
+        self.throw_estimator = ThrowVelocityEstimator()
+        # 发射物体被回收时末尾的物体会换编号，拖动中的编号跟着更新
+        self.world.body_listeners.append(self)
+
+        # 控制变量
+        self.running = True
+        self.paused = False
+        self.show_info = True
+        self.lock = threading.Lock()
+
+        self.reset()
+
+        # 创建并启动模拟线程
+        self.simulation_thread = threading.Thread(target=self.simulation_loop)
+        self.simulation_thread.daemon = True
+        self.simulation_thread.start()
+
+    def reset(self):
+        """重置为一串用弹簧连接的小球"""
+        with self.lock:
+            self.world.clear()
+            self.dragging = None
+            self.springs.clear()
+            self.diagnostics.reset()
+            for k in range(10):
+                self.world.add_body(40.0 + k * 15.0, 100.0, vx=5.0)
+            self.springs.connect(self.world, range(0, 9), range(1, 10), stiffness=40.0, damping=0.5)
+
+    def remap_bodies(self, remap):
+        """物体被移除或移动后更新拖动中的物体编号（模拟线程中调用，已持有 lock）"""
+        if self.dragging is not None:
+            index = int(remap([self.dragging])[0])
+            self.dragging = index if index >= 0 else None
+
+    def pick_body(self, sx, sy):
+        """返回屏幕坐标下被点中的物体索引，没有则返回 None"""
+        x, y = to_world(sx, sy)
+        n = self.world.count
+        d = self.world.pos[:n] - (x, y)
+        dist2 = (d * d).sum(axis=1)
+        hit = dist2 <= self.world.radius[:n] ** 2
+        if not hit.any():
+            return None
+        return int(dist2.argmin())
+
+    def handle_events(self):
+        """处理用户输入事件"""
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                self.running = False
+            elif event.type == KEYDOWN:
+                if event.key == K_ESCAPE:
+                    self.running = False
+                elif event.key == K_SPACE:
+                    self.paused = not self.paused
+                elif event.key == K_i:
+                    self.show_info = not self.show_info
+                elif event.key == K_UP and self.time_step < 0.1:
+                    self.time_step += 0.005
+                elif event.key == K_DOWN and self.time_step > 0.005:
+                    self.time_step -= 0.005
+                elif event.key == K_r:
+                    self.reset()
+                elif event.key == K_e:
+                    with self.lock:
+                        self.diagnostics.export(TRACE_PATH)
+                elif event.key == K_j:
+                    with self.lock:
+                        self.soft_bodies.add_jelly(self.world, (self.world.width / 2, 150.0), 10.0,
+                                                   spacing=1.5, stiffness=300.0, mass=5.0)
+                elif event.key == K_k:
+                    with self.lock:
+                        self.soft_bodies.add_cloth(self.world, (60.0, 170.0), 14, 24, spacing=2.0,
+                                                   stiffness=2000.0, mass=3.0)
+                elif event.key == K_f:
+                    self.fountain.enabled = not self.fountain.enabled
+                elif event.key == K_c:
+                    with self.lock:
+                        self.contact_solver.reset()
+                        self.world.contact_solver = None if self.world.contact_solver else self.contact_solver
+                elif event.key in self.fields:
+                    field = self.fields[event.key]
+                    field.enabled = not field.enabled
+            elif event.type == MOUSEBUTTONDOWN:
+                if event.button == 3:  # 右键点击：在鼠标位置添加新球
+                    x, y = to_world(*event.pos)
+                    with self.lock:
+                        self.world.add_body(x, y, vx=5.0)
+                elif event.button == 1:  # 左键点击：拖动小球
+                    with self.lock:
+                        index = self.pick_body(*event.pos)
+                        if index is not None:
+                            self.dragging = index
+                            x, y = to_world(*event.pos)
+                            self.drag_offset_x = self.world.pos[index, 0] - x
+                            self.drag_offset_y = self.world.pos[index, 1] - y
+                            self.drag_mass = self.world.body_mass(index)
+                            # 拖动时质量视为无穷大，不再受力
+                            self.world.set_mass(index, float("inf"))
+                            self.world.vel[index] = 0.0
+                    if self.dragging is not None:
+                        self.throw_estimator.reset(event.pos[0], event.pos[1], pygame.time.get_ticks())
+            elif event.type == MOUSEMOTION:
+                if self.dragging is not None:
+                    x, y = to_world(*event.pos)
+                    with self.lock:
+                        # 持有锁之后再读编号，被拖动的物体可能刚被回收
+                        if self.dragging is not None:
+                            self.world.pos[self.dragging] = (x + self.drag_offset_x, y + self.drag_offset_y)
+                    self.throw_estimator.push(event.pos[0], event.pos[1], pygame.time.get_ticks())
+            elif event.type == MOUSEBUTTONUP:
+                if event.button == 1 and self.dragging is not None:
+                    current_time = pygame.time.get_ticks()
+                    self.throw_estimator.push(event.pos[0], event.pos[1], current_time)
+                    mouse_velocity_x, mouse_velocity_y = self.throw_estimator.estimate(current_time)
+                    # 像素/毫秒 -> m/s，屏幕 y 向下所以垂直方向取反
+                    scale = 1000.0 / SCALE_FACTOR * THROW_GAIN
+                    vx = max(-MAX_THROW_VELOCITY, min(mouse_velocity_x * scale, MAX_THROW_VELOCITY))
+                    vy = max(-MAX_THROW_VELOCITY, min(-mouse_velocity_y * scale, MAX_THROW_VELOCITY))
+                    with self.lock:
+                        if self.dragging is not None:
+                            self.world.release_body(self.dragging, (vx, vy), self.drag_mass)
+                        self.dragging = None
+                    self.throw_estimator.reset()
+
+    def simulation_loop(self):
+        """物理模拟主循环"""
+        while self.running:
+            if not self.paused:
+                with self.lock:
+                    self.world.step(self.time_step)
+            # 控制模拟速度
+            time.sleep(self.time_step)
+
+    def draw(self):
+        """绘制游戏界面"""
+        # 清屏
+        self.screen.fill((240, 240, 240))
+
+        # 绘制地面
+        pygame.draw.rect(self.screen, (50, 50, 50), (0, GROUND_Y, SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_Y))
+
+        with self.lock:
+            world = self.world
+            n = world.count
+            screen_pos = world.pos[:n] * (SCALE_FACTOR, -SCALE_FACTOR) + (0, GROUND_Y)
+            screen_radius = world.radius[:n] * SCALE_FACTOR
+
+            # 绘制静态碰撞体
+            for a, b in zip(self.geometry.a, self.geometry.b):
+                pygame.draw.line(self.screen, (50, 50, 50), to_screen(*a), to_screen(*b), 3)
+
+            # 绘制弹簧
+            for i, j in zip(self.springs.i, self.springs.j):
+                pygame.draw.line(self.screen, (120, 120, 120), screen_pos[i], screen_pos[j], 2)
+
+            # 绘制软体
+            for i, j in zip(self.soft_bodies.i, self.soft_bodies.j):
+                pygame.draw.line(self.screen, (200, 80, 80), screen_pos[i], screen_pos[j], 1)
+
+            # 绘制小球
+            for (x, y), r in zip(screen_pos, screen_radius):
+                pygame.draw.circle(self.screen, (255, 255, 0), (int(x), int(y)), max(1, int(r)))
+
+            body_count = n
+            rebound_count = int(world.rebound_count[:n].sum())
+            time_elapsed = world.time_elapsed
+            stats = self.diagnostics.summary()
+
+        # 绘制信息文本
+        if self.show_info:
+            count_text = self.font.render(f"物体数: {body_count}", True, (0, 0, 0))
+            time_text = self.font.render(f"时间: {time_elapsed:.2f} 秒", True, (0, 0, 0))
+            rebound_text = self.font.render(f"反弹次数: {rebound_count}", True, (0, 0, 0))
+            names = ["线性阻力", "二次阻力", "均匀风", "湍流风", "吸引子"]
+            states = " ".join(f"{k + 1}.{name}{'开' if field.enabled else '关'}"
+                              for k, (name, field) in enumerate(zip(names, self.fields.values())))
+            states += f" C.小球碰撞{'开' if self.world.contact_solver else '关'}"
+            states += f" F.喷泉{'开' if self.fountain.enabled else '关'}({self.emitters.live})"
+            field_text = self.small_font.render(states, True, (0, 0, 0))
+            energy_text = self.small_font.render(
+                f"动能: {stats['kinetic']:.1f} J  势能: {stats['potential']:.1f} J  "
+                f"总能量: {stats['total']:.1f} J (均值 {stats['total_mean']:.1f} ± {stats['total_std']:.1f})",
+                True, (0, 0, 0))
+            momentum_text = self.small_font.render(
+                f"动量: ({stats['momentum'][0]:.1f}, {stats['momentum'][1]:.1f}) kg·m/s  "
+                f"每次撞击损失: {stats['loss_per_impact']:.2f} J (E:导出轨迹)",
+                True, (0, 0, 0))
+            step_text = self.small_font.render(f"时间步长: {self.time_step:.3f}秒 (↑↓调整)", True, (0, 0, 0))
+            info_text = self.small_font.render("空格:暂停/继续 | I:显示/隐藏信息 | R:重置 | 右键:添加小球 | J/K:果冻/布料 | ESC:退出", True, (0, 0, 0))
+
+            self.screen.blit(count_text, (10, 10))
+            self.screen.blit(time_text, (10, 40))
+            self.screen.blit(rebound_text, (10, 70))
+            self.screen.blit(field_text, (10, 100))
+            self.screen.blit(energy_text, (10, 125))
+            self.screen.blit(momentum_text, (10, 150))
+            self.screen.blit(step_text, (10, SCREEN_HEIGHT - 40))
+            self.screen.blit(info_text, (10, SCREEN_HEIGHT - 20))
+
+        # 更新显示
+        pygame.display.flip()
+
+    def run(self):
+        """运行模拟主循环"""
+        while self.running:
+            self.handle_events()
+            self.draw()
+            self.clock.tick(60)  # 限制帧率
+        pygame.quit()
+        sys.exit()
+
+if __name__ == "__main__":
+
+    # 创建并运行模拟器
+    simulator = FreeFallSimulator()
+
+    # 初始化结束
+    simulator.run()
@@ -0,0 +1,294 @@
+import time
+import threading
+import numpy as np
+import pygame
+import sys
+from pygame.locals import *
+
+from physice import (
+    Camera,
+    Diagnostics,
+    LinearDrag,
+    Material,
+    StaticGeometry,
+    ThrowVelocityEstimator,
+    World,
+    load_scene,
+    spawn_random,
+)
+
+# 图形界面常量
+SCREEN_WIDTH = 800  # 窗口宽度
+SCREEN_HEIGHT = 600  # 窗口高度
+SCALE_FACTOR = 3  # 初始缩放因子，将米转换为像素
+
+# 世界常量（单位：米），远大于一个窗口
+WORLD_WIDTH = 20000.0
+BODY_COUNT = 200000
+BODY_RADIUS = 0.5
+
+# 细节层次常量
+LOD_INTERVAL = 8  # 视野外的物体每 8 步更新一次
+LOD_MARGIN = 20.0  # 视野外扩距离，单位：米
+
+# 抛出惯性常量
+THROW_GAIN = 1.8  # 速度增益
+MAX_THROW_VELOCITY = 120.0  # 最大抛出速度
+
+TRACE_PATH = "trace.csv"  # 按 E 导出能量/动量轨迹的文件
+
+
+class FreeFallSimulator:
+    def __init__(self, scene_path=None):
+        # 初始化Pygame
+        pygame.init()
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("大世界模拟")
+        self.clock = pygame.time.Clock()
+        self.font = pygame.font.SysFont("SimHei", 24)
+        self.small_font = pygame.font.SysFont("SimHei", 18)
+
+        # 物理世界：从场景文件加载，没有场景文件时生成起伏的地形和大量小球
+        self.scene_path = scene_path
+        self.world = None
+        self.time_step = 1 / 60  # 默认时间步长
+
+        # 相机：初始对准世界左端，地面在窗口底部附近
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, zoom=SCALE_FACTOR,
+                             center=(SCREEN_WIDTH / (2 * SCALE_FACTOR), SCREEN_HEIGHT / (2 * SCALE_FACTOR) - 15.0))
+        self.lod_enabled = True
+        self.panning = False
+        self.visible_count = 0
+
+        # 拖动状态
+        self.dragging = None  # 正在拖动的物体索引
+        self.drag_mass = 1.0  # 被拖动物体原来的质量，松开时恢复
+        self.drag_offset_x = 0.0
+        self.drag_offset_y = 0.0
+        self.throw_estimator = ThrowVelocityEstimator()
+
+        # 能量与动量诊断，重置场景时沿用同一份统计
+        self.diagnostics = Diagnostics()
+
+        # 控制变量
+        self.running = True
+        self.paused = False
+        self.show_info = True
+        self.lock = threading.Lock()
+
+        self.reset()
+
+        # 创建并启动模拟线程
+        self.simulation_thread = threading.Thread(target=self.simulation_loop)
+        self.simulation_thread.daemon = True
+        self.simulation_thread.start()
+
+    def reset(self):
+        """重新加载场景"""
+        if self.scene_path is not None:
+            world = load_scene(self.scene_path)
+        else:
+            world = World(capacity=BODY_COUNT, width=WORLD_WIDTH)
+            world.force_fields.append(LinearDrag(0.01))
+            world.static_geometry = StaticGeometry()
+            xs = np.linspace(0.0, WORLD_WIDTH, 20001)
+            world.static_geometry.add_polyline(np.c_[xs, 2.0 + 1.5 * np.sin(xs / 50.0)])
+            spawn_random(world, BODY_COUNT, (0.0, 10.0, WORLD_WIDTH, 200.0), radius=BODY_RADIUS,
+                         material=Material(restitution=0.7), velocity_sigma=3.0)
+        world.diagnostics = self.diagnostics
+        # 发射物体被回收时末尾的物体会换编号，拖动中的编号跟着更新
+        world.body_listeners.append(self)
+        with self.lock:
+            self.diagnostics.reset()
+            self.world = world
+            self.dragging = None
+
+    def remap_bodies(self, remap):
+        """物体被移除或移动后更新拖动中的物体编号（模拟线程中调用，已持有 lock）"""
+        if self.dragging is not None:
+            index = int(remap([self.dragging])[0])
+            self.dragging = index if index >= 0 else None
+
+    def update_view(self):
+        """把相机视野同步给物理世界，用于细节层次步进"""
+        if self.lod_enabled:
+            self.world.set_view(*self.camera.view_rect(), interval=LOD_INTERVAL, margin=LOD_MARGIN)
+        else:
+            self.world.clear_view()
+
+    def pick_body(self, sx, sy):
+        """返回屏幕坐标下被点中的物体索引，没有则返回 None"""
+        x, y = self.camera.to_world(sx, sy)
+        candidates = self.world.bodies_in_rect((x, y), (x, y))
+        if not len(candidates):
+            return None
+        d = self.world.pos[candidates] - (x, y)
+        return int(candidates[(d * d).sum(axis=1).argmin()])
+
+    def handle_events(self):
+        """处理用户输入事件"""
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                self.running = False
+            elif event.type == KEYDOWN:
+                if event.key == K_ESCAPE:
+                    self.running = False
+                elif event.key == K_SPACE:
+                    self.paused = not self.paused
+                elif event.key == K_i:
+                    self.show_info = not self.show_info
+                elif event.key == K_l:
+                    self.lod_enabled = not self.lod_enabled
+                elif event.key == K_r:
+                    self.reset()
+                elif event.key == K_e:
+                    with self.lock:
+                        self.diagnostics.export(TRACE_PATH)
+            elif event.type == MOUSEWHEEL:
+                # 滚轮以鼠标位置为中心缩放
+                sx, sy = pygame.mouse.get_pos()
+                self.camera.zoom_at(sx, sy, 1.15 ** event.y)
+            elif event.type == MOUSEBUTTONDOWN:
+                if event.button == 2:  # 中键拖动平移视野
+                    self.panning = True
+                elif event.button == 3:  # 右键点击：在鼠标位置添加新球
+                    x, y = self.camera.to_world(*event.pos)
+                    with self.lock:
+                        self.world.add_body(x, y, radius=BODY_RADIUS * 4)
+                elif event.button == 1:  # 左键点击：拖动小球
+                    with self.lock:
+                        index = self.pick_body(*event.pos)
+                        if index is not None:
+                            self.dragging = index
+                            x, y = self.camera.to_world(*event.pos)
+                            self.drag_offset_x = self.world.pos[index, 0] - x
+                            self.drag_offset_y = self.world.pos[index, 1] - y
+                            # 拖动时质量视为无穷大，不再受力
+                            self.drag_mass = self.world.body_mass(index)
+                            self.world.set_mass(index, float("inf"))
+                            self.world.vel[index] = 0.0
+                    if self.dragging is not None:
+                        self.throw_estimator.reset(event.pos[0], event.pos[1], pygame.time.get_ticks())
+            elif event.type == MOUSEMOTION:
+                if self.panning:
+                    self.camera.pan(*event.rel)
+                if self.dragging is not None:
+                    x, y = self.camera.to_world(*event.pos)
+                    with self.lock:
+                        # 持有锁之后再读编号，被拖动的物体可能刚被回收
+                        if self.dragging is not None:
+                            self.world.pos[self.dragging] = (x + self.drag_offset_x, y + self.drag_offset_y)
+                    self.throw_estimator.push(event.pos[0], event.pos[1], pygame.time.get_ticks())
+            elif event.type == MOUSEBUTTONUP:
+                if event.button == 2:
+                    self.panning = False
+                elif event.button == 1 and self.dragging is not None:
+                    current_time = pygame.time.get_ticks()
+                    self.throw_estimator.push(event.pos[0], event.pos[1], current_time)
+                    mouse_velocity_x, mouse_velocity_y = self.throw_estimator.estimate(current_time)
+                    # 像素/毫秒 -> m/s，屏幕 y 向下所以垂直方向取反
+                    scale = 1000.0 / self.camera.zoom * THROW_GAIN
+                    vx = max(-MAX_THROW_VELOCITY, min(mouse_velocity_x * scale, MAX_THROW_VELOCITY))
+                    vy = max(-MAX_THROW_VELOCITY, min(-mouse_velocity_y * scale, MAX_THROW_VELOCITY))
+                    with self.lock:
+                        if self.dragging is not None:
+                            self.world.release_body(self.dragging, (vx, vy), self.drag_mass)
+                        self.dragging = None
+                    self.throw_estimator.reset()
+
+        # 方向键平移视野
+        keys = pygame.key.get_pressed()
+        dx = (keys[K_LEFT] - keys[K_RIGHT]) * 10
+        dy = (keys[K_UP] - keys[K_DOWN]) * 10
+        if dx or dy:
+            self.camera.pan(dx, dy)
+
+    def simulation_loop(self):
+        """物理模拟主循环"""
+        while self.running:
+            if not self.paused:
+                with self.lock:
+                    self.update_view()
+                    self.world.step(self.time_step)
+            # 控制模拟速度
+            time.sleep(self.time_step)
+
+    def draw(self):
+        """绘制游戏界面，只绘制视野内的物体和地形"""
+        # 清屏
+        self.screen.fill((240, 240, 240))
+        lo, hi = self.camera.view_rect()
+
+        with self.lock:
+            # 绘制视野内的地形线段
+            geometry = self.world.static_geometry
+            if geometry is not None:
+                segments = geometry.query_aabb(lo, hi)
+                a = self.camera.to_screen(geometry.a[segments])
+                b = self.camera.to_screen(geometry.b[segments])
+                for p, q in zip(a, b):
+                    pygame.draw.line(self.screen, (50, 50, 50), p, q, 2)
+
+            # 绘制软体的弹簧
+            soft_bodies = self.world.soft_bodies
+            if soft_bodies is not None and len(soft_bodies):
+                a = self.camera.to_screen(self.world.pos[soft_bodies.i])
+                b = self.camera.to_screen(self.world.pos[soft_bodies.j])
+                for p, q in zip(a, b):
+                    pygame.draw.line(self.screen, (200, 80, 80), p, q, 1)
+
+            # 通过物体网格索引找到视野内的小球
+            visible = self.world.bodies_in_rect(lo, hi)
+            screen_pos = self.camera.to_screen(self.world.pos[visible])
+            screen_radius = np.maximum(self.world.radius[visible] * self.camera.zoom, 1).astype(int)
+            body_count = self.world.count
+            time_elapsed = self.world.time_elapsed
+            stats = self.diagnostics.summary()
+
+        for (x, y), r in zip(screen_pos.astype(int), screen_radius):
+            pygame.draw.circle(self.screen, (255, 200, 0), (x, y), r)
+        self.visible_count = len(visible)
+
+        # 绘制信息文本
+        if self.show_info:
+            count_text = self.font.render(f"物体数: {body_count}  可见: {self.visible_count}", True, (0, 0, 0))
+            time_text = self.font.render(f"时间: {time_elapsed:.2f} 秒", True, (0, 0, 0))
+            camera_text = self.small_font.render(
+                f"视野中心: ({self.camera.center[0]:.0f}, {self.camera.center[1]:.0f}) 米  缩放: {self.camera.zoom:.2f}",
+                True, (0, 0, 0))
+            lod_text = self.small_font.render(f"细节层次: {'开' if self.lod_enabled else '关'} (L切换)", True, (0, 0, 0))
+            energy_text = self.small_font.render(
+                f"总能量: {stats['total']:.4g} J (均值 {stats['total_mean']:.4g} ± {stats['total_std']:.2g})  "
+                f"动能: {stats['kinetic']:.4g} J", True, (0, 0, 0))
+            momentum_text = self.small_font.render(
+                f"动量: ({stats['momentum'][0]:.4g}, {stats['momentum'][1]:.4g})  "
+                f"每次撞击损失: {stats['loss_per_impact']:.3g} J", True, (0, 0, 0))
+            info_text = self.small_font.render("方向键/中键:平移 | 滚轮:缩放 | 空格:暂停 | R:重置 | E:导出轨迹 | ESC:退出", True, (0, 0, 0))
+
+            self.screen.blit(count_text, (10, 10))
+            self.screen.blit(time_text, (10, 40))
+            self.screen.blit(camera_text, (10, 70))
+            self.screen.blit(lod_text, (10, 90))
+            self.screen.blit(energy_text, (10, 110))
+            self.screen.blit(momentum_text, (10, 130))
+            self.screen.blit(info_text, (10, SCREEN_HEIGHT - 20))
+
+        # 更新显示
+        pygame.display.flip()
+
+    def run(self):
+        """运行模拟主循环"""
+        while self.running:
+            self.handle_events()
+            self.draw()
+            self.clock.tick(60)  # 限制帧率
+        pygame.quit()
+        sys.exit()
+
+if __name__ == "__main__":
+
+    # 创建并运行模拟器，可以在命令行指定场景文件，例如 scenes/million.json
+    simulator = FreeFallSimulator(sys.argv[1] if len(sys.argv) > 1 else None)
+
+    # 初始化结束
+    simulator.run()
@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+
+from physice import Diagnostics, SimulationServer, load_scene
+
+# 无窗口运行模拟，把状态流发布给内网中的观察端（仪表盘），并接收拖动/添加/重置命令。
+# 默认只监听本机，需要让其他机器访问时加 --host 0.0.0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PhysicE 状态流服务器")
+    parser.add_argument("scene", help="场景文件，例如 scenes/ramps.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=20.0, help="每秒发布的帧数")
+    parser.add_argument("--quantum", type=float, default=0.01, help="位置量化精度（米）")
+    parser.add_argument("--threshold", type=int, default=2, help="移动超过多少个量化单位才发送")
+    parser.add_argument("--trace", help="退出时把能量/动量轨迹导出到该文件（.csv 或 .npz）")
+    args = parser.parse_args()
+
+    diagnostics = Diagnostics() if args.trace else None
+
+    def make_world():
+        world = load_scene(args.scene)
+        if diagnostics is not None:
+            diagnostics.reset()
+            world.diagnostics = diagnostics
+        return world
+
+    server = SimulationServer(make_world, host=args.host, port=args.port,
+                              rate=args.rate, quantum=args.quantum, threshold=args.threshold)
+    print(f"状态流服务器监听 {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if diagnostics is not None:
+            diagnostics.export(args.trace)
+            print(f"轨迹已导出到 {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
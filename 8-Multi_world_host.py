@@ -0,0 +1,39 @@
+import argparse
+import time
+
+from physice import WorldManager, load_scene
+
+# 在一个进程里托管大量互不相关的无窗口世界（每个用户会话一个），
+# 用固定大小的线程池分批步进，定期打印调度统计。
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PhysicE 多世界托管")
+    parser.add_argument("scene", help="每个世界加载的场景文件，例如 scenes/ramps.json")
+    parser.add_argument("--worlds", type=int, default=100, help="托管的世界数")
+    parser.add_argument("--workers", type=int, default=None, help="线程数，默认为 CPU 核数")
+    parser.add_argument("--batch", type=int, default=32, help="每个线程池任务步进的世界数")
+    parser.add_argument("--budget", type=float, default=2.0, help="每个世界每轮的计算时间预算（毫秒）")
+    parser.add_argument("--duration", type=float, default=None, help="运行时长（秒），默认一直运行")
+    args = parser.parse_args()
+
+    manager = WorldManager(workers=args.workers, batch_size=args.batch, budget=args.budget / 1000)
+    for _ in range(args.worlds):
+        manager.add(load_scene(args.scene))
+    print(f"托管 {len(manager)} 个世界，{manager.workers} 个线程，每批 {args.batch} 个")
+
+    start = time.monotonic()
+    with manager:
+        try:
+            while args.duration is None or time.monotonic() - start < args.duration:
+                manager.run(duration=1.0)
+                stats = manager.stats()
+                print(f"轮次 {stats['rounds']}  本轮 {stats['round_time'] * 1000:.1f} ms  "
+                      f"平均每个世界 {stats['mean_cost'] * 1000:.2f} ms  "
+                      f"限速中 {stats['throttled']}  累计跳过 {stats['skipped']}  出错 {len(stats['errors'])}")
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
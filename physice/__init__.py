@@ -0,0 +1,59 @@
+"""PhysicE 物理模拟的公共组件"""
+
+from physice.camera import Camera
+from physice.colliders import StaticGeometry
+from physice.contacts import ContactSolver
+from physice.diagnostics import Diagnostics, RollingStats
+from physice.emitters import Emitter, EmitterSystem
+from physice.events import AsyncLogWriter, EventStream
+from physice.forces import (
+    ForceField,
+    Gravity,
+    LinearDrag,
+    PointAttractor,
+    QuadraticDrag,
+    SpringSet,
+    TurbulentWind,
+    UniformWind,
+)
+from physice.hosting import WorldManager, WorldSession
+from physice.parallel import ParallelWorld
+from physice.scene import Material, load_scene, spawn_grid, spawn_random
+from physice.server import SimulationServer, StateClient
+from physice.softbody import SoftBodySet
+from physice.spatial import BodyGrid
+from physice.velocity_estimator import ThrowVelocityEstimator
+from physice.world import World
+
+__all__ = [
+    "AsyncLogWriter",
+    "BodyGrid",
+    "Camera",
+    "ContactSolver",
+    "Diagnostics",
+    "Emitter",
+    "EmitterSystem",
+    "EventStream",
+    "ForceField",
+    "Gravity",
+    "LinearDrag",
+    "Material",
+    "ParallelWorld",
+    "PointAttractor",
+    "QuadraticDrag",
+    "RollingStats",
+    "SimulationServer",
+    "SoftBodySet",
+    "SpringSet",
+    "StateClient",
+    "StaticGeometry",
+    "ThrowVelocityEstimator",
+    "TurbulentWind",
+    "UniformWind",
+    "World",
+    "WorldManager",
+    "WorldSession",
+    "load_scene",
+    "spawn_grid",
+    "spawn_random",
+]
@@ -0,0 +1,46 @@
+import numpy as np
+
+# 相机默认参数
+MIN_ZOOM = 0.05  # 最小缩放（像素/米）
+MAX_ZOOM = 50.0  # 最大缩放（像素/米）
+
+
+class Camera:
+    """平移/缩放相机，负责世界坐标（米，y 向上）与屏幕坐标（像素，y 向下）的互相转换"""
+
+    def __init__(self, screen_width, screen_height, zoom=3.0, center=(0.0, 0.0)):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.zoom = zoom  # 缩放因子，像素/米
+        self.center = np.array(center, dtype=np.float64)  # 屏幕中心对应的世界坐标
+
+    def to_screen(self, points):
+        """世界坐标 (k, 2) 数组转换为屏幕坐标"""
+        points = np.asarray(points, dtype=np.float64)
+        screen = (points - self.center) * (self.zoom, -self.zoom)
+        screen += (self.screen_width / 2, self.screen_height / 2)
+        return screen
+
+    def to_world(self, sx, sy):
+        """屏幕上的一点转换为世界坐标"""
+        x = (sx - self.screen_width / 2) / self.zoom + self.center[0]
+        y = (self.screen_height / 2 - sy) / self.zoom + self.center[1]
+        return x, y
+
+    def pan(self, dx, dy):
+        """按屏幕像素平移视野（例如鼠标拖动的位移）"""
+        self.center[0] -= dx / self.zoom
+        self.center[1] += dy / self.zoom
+
+    def zoom_at(self, sx, sy, factor):
+        """以屏幕上的一点为中心缩放，缩放后该点对应的世界坐标保持不变"""
+        x, y = self.to_world(sx, sy)
+        self.zoom = min(max(self.zoom * factor, MIN_ZOOM), MAX_ZOOM)
+        nx, ny = self.to_world(sx, sy)
+        self.center[0] += x - nx
+        self.center[1] += y - ny
+
+    def view_rect(self):
+        """返回当前视野在世界坐标中的矩形 (lo, hi)"""
+        half = np.array([self.screen_width, self.screen_height]) / (2.0 * self.zoom)
+        return self.center - half, self.center + half
@@ -0,0 +1,229 @@
+import numpy as np
+
+from physice.events import CONTACT
+from physice.world import MIN_REBOUND_VELOCITY
+
+# 静态几何默认参数
+MAX_GRID_CELLS = 1 << 22  # 网格单元数上限，超过时自动放大单元
+
+
+def _dot(u, v):
+    """逐行点积，比 einsum 在两列数组上更快"""
+    return u[:, 0] * v[:, 0] + u[:, 1] * v[:, 1]
+
+
+def _expand_ranges(c0, c1):
+    """把每行的单元范围 [c0, c1] 展开成 (行号, 单元 x, 单元 y) 三个数组"""
+    span = c1 - c0 + 1
+    per_row = span[:, 0] * span[:, 1]
+    row = np.repeat(np.arange(len(c0)), per_row)
+    offset = np.arange(len(row)) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+    width = span[row, 0]
+    return row, c0[row, 0] + offset % width, c0[row, 1] + offset // width
+
+
+class StaticGeometry:
+    """静态线段碰撞体（坡道、平台、地形、多边形）及其均匀网格索引
+
+    线段存放在 a/b 两个 (m, 2) 数组中。建索引时每条线段写入它的包围盒覆盖的所有网格单元，
+    单元内容用 CSR 格式（cell_start + cell_items）存储。查询时每个物体只检查自己的
+    包围盒覆盖的单元里的线段，代价与场景中线段总数无关。
+    """
+
+    def __init__(self, cell_size=None):
+        self.cell_size = cell_size  # 网格单元边长，None 表示按线段长度和物体半径自动选择
+        self.a = np.zeros((0, 2))
+        self.b = np.zeros((0, 2))
+        self.restitution = np.zeros(0)  # 每条线段的反弹系数，NaN 表示使用物体自己的
+        self._built = False
+
+    def __len__(self):
+        return len(self.a)
+
+    def add_segments(self, a, b, restitution=np.nan):
+        """批量添加线段，a、b 为 (k, 2) 的端点数组"""
+        a = np.asarray(a, dtype=np.float64).reshape(-1, 2)
+        b = np.asarray(b, dtype=np.float64).reshape(-1, 2)
+        self.a = np.concatenate([self.a, a])
+        self.b = np.concatenate([self.b, b])
+        self.restitution = np.concatenate([self.restitution, np.broadcast_to(
+            np.asarray(restitution, dtype=np.float64), len(a))])
+        self._built = False
+
+    def add_polyline(self, points, restitution=np.nan):
+        """添加折线（例如地形轮廓），相邻点之间生成线段"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.add_segments(points[:-1], points[1:], restitution)
+
+    def add_polygon(self, points, restitution=np.nan):
+        """添加闭合多边形（例如平台、障碍物）"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.add_segments(points, np.roll(points, -1, axis=0), restitution)
+
+    def clear(self):
+        """移除所有线段"""
+        self.a = np.zeros((0, 2))
+        self.b = np.zeros((0, 2))
+        self.restitution = np.zeros(0)
+        self._built = False
+
+    def build(self, body_radius=0.0):
+        """重建网格索引，body_radius 为典型物体半径，用于自动选择单元大小"""
+        lo = np.minimum(self.a, self.b)
+        hi = np.maximum(self.a, self.b)
+        self.origin = lo.min(axis=0)
+        extent = hi.max(axis=0) - self.origin
+        cell = self.cell_size
+        if cell is None:
+            # 单元太大则每个单元里线段过多，太小则线段和物体都要跨越很多单元
+            length = np.hypot(*(self.b - self.a).T)
+            cell = max(2.0 * body_radius, float(np.median(length)), 1e-3)
+        while np.prod(np.floor(extent / cell) + 1) > MAX_GRID_CELLS:
+            cell *= 2.0
+        self._cell = cell
+        self.shape = (np.floor(extent / cell) + 1).astype(np.int64)
+
+        # 展开成 (单元编号, 线段编号) 列表，全部用数组运算完成
+        c0 = np.floor((lo - self.origin) / cell).astype(np.int64)
+        c1 = np.floor((hi - self.origin) / cell).astype(np.int64)
+        segment, cx, cy = _expand_ranges(c0, c1)
+        cell_id = cx * self.shape[1] + cy
+
+        order = np.argsort(cell_id, kind="stable")
+        self.cell_items = segment[order]
+        counts = np.bincount(cell_id, minlength=int(self.shape[0] * self.shape[1]))
+        self.cell_start = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.cell_start[1:])
+        self._built = True
+
+    def _cell_range(self, lo, hi):
+        """矩形 [lo, hi] 覆盖的网格单元范围，返回裁剪后的 c0、c1 以及是否与网格相交"""
+        inv = 1.0 / self._cell
+        c0 = np.floor((lo - self.origin) * inv).astype(np.int64)
+        c1 = np.floor((hi - self.origin) * inv).astype(np.int64)
+        overlap = (c1 >= 0).all(axis=1) & (c0 < self.shape).all(axis=1)
+        np.clip(c0, 0, self.shape - 1, out=c0)
+        np.clip(c1, 0, self.shape - 1, out=c1)
+        return c0, c1, overlap
+
+    def candidates(self, points, radius):
+        """返回 (点索引, 线段索引) 候选对
+
+        只包含圆 (points, radius) 的包围盒覆盖的网格单元中的线段；
+        同一条线段可能因为跨越多个单元而重复出现。
+        """
+        if not self._built:
+            self.build(float(np.median(radius)) if len(radius) else 0.0)
+        radius = radius[:, None]
+        c0, c1, overlap = self._cell_range(points - radius, points + radius)
+        inside = np.flatnonzero(overlap)
+        local, cx, cy = _expand_ranges(c0[inside], c1[inside])
+        cell_id = cx * self.shape[1] + cy
+        start = self.cell_start[cell_id]
+        count = self.cell_start[cell_id + 1] - start
+        body = np.repeat(inside[local], count)
+        offset = np.arange(len(body)) - np.repeat(np.cumsum(count) - count, count)
+        segment = self.cell_items[np.repeat(start, count) + offset]
+        return body, segment
+
+    def query_aabb(self, lo, hi):
+        """返回与矩形 [lo, hi] 重叠的网格单元中的线段索引（去重），用于绘制和调试"""
+        if not len(self.a):
+            return np.zeros(0, dtype=np.int64)
+        if not self._built:
+            self.build()
+        c0, c1, overlap = self._cell_range(np.asarray([lo], dtype=np.float64),
+                                           np.asarray([hi], dtype=np.float64))
+        if not overlap[0]:
+            return np.zeros(0, dtype=np.int64)
+        _, cx, cy = _expand_ranges(c0, c1)
+        cell_id = cx * self.shape[1] + cy
+        start = self.cell_start[cell_id]
+        count = self.cell_start[cell_id + 1] - start
+        offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        return np.unique(self.cell_items[np.repeat(start, count) + offset])
+
+    def contacts(self, pos, radius, active, margin=0.0):
+        """检测 active 中的物体与线段的接触，每个物体只保留穿透最深的一条线段
+
+        返回 (物体索引, 线段索引, 法线, 穿透深度)，法线指向把物体推出线段的方向。
+        margin > 0 时距离线段不到 margin 的物体也算接触（深度为负），用于接触求解器的预测接触。
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        local, segment = self.candidates(pos[active], radius[active] + margin)
+        if not len(local):
+            return empty, empty, np.zeros((0, 2)), np.zeros(0)
+        body = active[local]
+        a = self.a[segment]
+        ab = self.b[segment] - a
+        ap = pos[body] - a
+        t = _dot(ap, ab) / np.maximum(_dot(ab, ab), 1e-12)
+        np.clip(t, 0.0, 1.0, out=t)
+        d = ap - t[:, None] * ab
+        dist = np.hypot(d[:, 0], d[:, 1])
+        depth = radius[body] - dist
+        hit = depth > -margin
+        body = body[hit]
+        segment = segment[hit]
+        depth = depth[hit]
+        d = d[hit]
+        dist = dist[hit]
+        ab = ab[hit]
+
+        # 每个物体只保留穿透最深的接触
+        order = np.lexsort((-depth, body))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = body[order[1:]] != body[order[:-1]]
+        keep = order[first]
+        body = body[keep]
+        segment = segment[keep]
+        depth = depth[keep]
+        dist = dist[keep]
+
+        # 接触法线：圆心到最近点的方向；圆心恰好在线段上时取线段的法线
+        normal = d[keep] / np.maximum(dist, 1e-12)[:, None]
+        degenerate = dist < 1e-9
+        if degenerate.any():
+            seg = ab[keep][degenerate]
+            normal[degenerate] = np.stack([-seg[:, 1], seg[:, 0]], axis=1) / np.hypot(seg[:, 0], seg[:, 1])[:, None]
+        return body, segment, normal, depth
+
+    def collide(self, world, index=None, iterations=2):
+        """检测并解决物体与静态线段的穿透，反弹规则与地面一致
+
+        每个物体每轮只处理穿透最深的一条线段，迭代 iterations 轮以处理拐角处的多重接触。
+        """
+        n = world.count
+        if not n or not len(self.a):
+            return
+        pos = world.pos[:n]
+        vel = world.vel[:n]
+        radius = world.radius[:n]
+        # 第一轮检查 index 中的可动物体，之后只复查上一轮发生接触的物体
+        active = np.arange(n)
+        if index is not None:
+            active = active[index]
+        active = active[world.inv_mass[active] > 0.0]
+        for _ in range(iterations):
+            body, segment, normal, depth = self.contacts(pos, radius, active)
+            if not len(body):
+                return
+
+            # 位置修正
+            pos[body] += normal * depth[:, None]
+
+            # 速度反弹：只反转法向分量
+            v = vel[body]
+            vn = _dot(v, normal)
+            restitution = self.restitution[segment]
+            restitution = np.where(np.isnan(restitution), world.restitution[body], restitution)
+            approaching = vn < 0.0
+            bounce = -vn * restitution
+            bounce[bounce < MIN_REBOUND_VELOCITY] = 0.0
+            dv = np.where(approaching, bounce - vn, 0.0)
+            vel[body] = v + dv[:, None] * normal
+            impact = vn < -MIN_REBOUND_VELOCITY
+            world.rebound_count[body] += impact
+            if impact.any():
+                world._record_impacts(CONTACT, body[impact], -vn[impact], bounce[impact])
+            active = body
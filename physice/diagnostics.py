@@ -0,0 +1,187 @@
+import os
+
+import numpy as np
+
+# 诊断默认参数
+DEFAULT_INTERVAL = 10  # 每隔多少步采样一次，60 步/秒时每秒 6 次
+DEFAULT_WINDOW = 60  # 滚动统计窗口（采样次数），按默认间隔、60 步/秒约 10 秒
+DEFAULT_TRACE_LENGTH = 1 << 16  # 轨迹记录保留的采样条数，超出后覆盖最旧的记录
+
+# 每次采样写入轨迹的字段
+TRACE_DTYPE = np.dtype([
+    ("time", np.float64),
+    ("kinetic", np.float64),  # 总动能
+    ("potential", np.float64),  # 总势能（各力场 potential_energy 之和）
+    ("total", np.float64),  # 动能 + 势能
+    ("momentum_x", np.float64),
+    ("momentum_y", np.float64),
+    ("impacts", np.int64),  # 本次采样区间内的撞击次数
+    ("impact_loss", np.float64),  # 本次采样区间内撞击损失的能量
+])
+
+
+class RollingStats:
+    """固定窗口的滚动统计
+
+    数值放在环形缓冲区中，同时维护累计和与平方和，push 和 mean/std 都是 O(1)。
+    每绕缓冲区一圈用缓冲区重新求一次和，避免浮点累计误差越积越大。
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.values = np.zeros(window)
+        self.size = 0
+        self._head = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, value):
+        window = len(self.values)
+        if self.size == window:
+            old = self.values[self._head]
+            self._sum -= old
+            self._sum_sq -= old * old
+        else:
+            self.size += 1
+        self.values[self._head] = value
+        self._sum += value
+        self._sum_sq += value * value
+        self._head += 1
+        if self._head == window:
+            self._head = 0
+            self._sum = float(self.values.sum())
+            self._sum_sq = float(np.dot(self.values, self.values))
+
+    @property
+    def last(self):
+        return float(self.values[self._head - 1]) if self.size else 0.0
+
+    @property
+    def mean(self):
+        return self._sum / self.size if self.size else 0.0
+
+    @property
+    def std(self):
+        if not self.size:
+            return 0.0
+        mean = self._sum / self.size
+        return max(self._sum_sq / self.size - mean * mean, 0.0) ** 0.5
+
+    @property
+    def min(self):
+        return float(self.values[:self.size].min()) if self.size else 0.0
+
+    @property
+    def max(self):
+        return float(self.values[:self.size].max()) if self.size else 0.0
+
+    def reset(self):
+        self.size = 0
+        self._head = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+
+class Diagnostics:
+    """能量与动量诊断
+
+    挂到 world.diagnostics 上后，每 interval 步对物体数组做几次向量化归约
+    （动能、各力场和软体弹簧的势能、动量），结果送入滚动统计并追加到轨迹记录；
+    地面、墙和静态几何的撞击在碰撞处理时顺带累计损失的能量（只涉及被撞击的物体）。
+    每次采样是几次 O(n) 的归约，100 万个物体约 6 ms，相当于只有重力时一步（约 17 ms）的三分之一，
+    所以默认每 10 步采样一次，平均每步约 0.6 ms，可以常开；需要逐步的轨迹时设 interval=1。
+
+    细节层次步进时远处物体的状态落后若干步，此时的总量是近似值。
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, trace_length=DEFAULT_TRACE_LENGTH,
+                 interval=DEFAULT_INTERVAL):
+        self.interval = interval  # 每隔多少步采样一次
+        self.kinetic = RollingStats(window)
+        self.potential = RollingStats(window)
+        self.total = RollingStats(window)
+        self.momentum_x = RollingStats(window)
+        self.momentum_y = RollingStats(window)
+        self.loss_per_impact = RollingStats(window)  # 平均每次撞击损失的能量
+        self.trace = np.zeros(trace_length, dtype=TRACE_DTYPE)
+        self.samples = 0  # 已采样次数（可能超过 trace_length）
+        self._steps = 0
+        self._impacts = 0
+        self._impact_loss = 0.0
+
+    def record_impacts(self, mass, speed_in, speed_out):
+        """累计一批撞击损失的能量，speed_in/speed_out 为撞击前后的法向速度大小"""
+        self._impacts += len(mass)
+        self._impact_loss += 0.5 * float(np.dot(mass, speed_in * speed_in - speed_out * speed_out))
+
+    def sample(self, world):
+        """在步进结束时调用，每 interval 步做一次归约"""
+        self._steps += 1
+        if self._steps < self.interval:
+            return
+        self._steps = 0
+        n = world.count
+        mass = world.mass[:n]
+        vel = world.vel[:n]
+        # 矩阵乘和 einsum 都直接在原数组上归约，不产生中间数组
+        momentum_x, momentum_y = (float(p) for p in mass @ vel)
+        kinetic = 0.5 * float(np.einsum("i,ij,ij->", mass, vel, vel))
+        potential = float(sum(field.potential_energy(world, n)
+                              for field in world.force_fields if field.enabled))
+        if world.soft_bodies is not None:
+            potential += float(world.soft_bodies.potential_energy(world, n))
+
+        self.kinetic.push(kinetic)
+        self.potential.push(potential)
+        self.total.push(kinetic + potential)
+        self.momentum_x.push(momentum_x)
+        self.momentum_y.push(momentum_y)
+        if self._impacts:
+            self.loss_per_impact.push(self._impact_loss / self._impacts)
+
+        row = self.samples % len(self.trace)
+        self.trace[row] = (world.time_elapsed, kinetic, potential, kinetic + potential,
+                           momentum_x, momentum_y, self._impacts, self._impact_loss)
+        self.samples += 1
+        self._impacts = 0
+        self._impact_loss = 0.0
+
+    def history(self):
+        """按时间顺序返回轨迹记录（结构化数组副本）"""
+        length = len(self.trace)
+        if self.samples <= length:
+            return self.trace[:self.samples].copy()
+        start = self.samples % length
+        return np.concatenate([self.trace[start:], self.trace[:start]])
+
+    def summary(self):
+        """最新值与滚动窗口统计，供 HUD 显示"""
+        return {
+            "kinetic": self.kinetic.last,
+            "potential": self.potential.last,
+            "total": self.total.last,
+            "total_mean": self.total.mean,
+            "total_std": self.total.std,
+            "momentum": (self.momentum_x.last, self.momentum_y.last),
+            "loss_per_impact": self.loss_per_impact.mean,
+        }
+
+    def export(self, path):
+        """导出轨迹记录，按扩展名选择 .npz 或 .csv"""
+        history = self.history()
+        if os.fspath(path).endswith(".npz"):
+            np.savez(path, **{name: history[name] for name in TRACE_DTYPE.names})
+        else:
+            np.savetxt(path, history, delimiter=",", header=",".join(TRACE_DTYPE.names),
+                       comments="", fmt=["%.6f"] * 6 + ["%d", "%.6f"])
+
+    def reset(self):
+        for stats in (self.kinetic, self.potential, self.total,
+                      self.momentum_x, self.momentum_y, self.loss_per_impact):
+            stats.reset()
+        self.samples = 0
+        self._steps = 0
+        self._impacts = 0
+        self._impact_loss = 0.0
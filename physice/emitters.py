@@ -0,0 +1,154 @@
+import numpy as np
+
+from physice.events import DESPAWN, SPAWN
+from physice.world import REBOUND_COEFFICIENT
+
+# 发射器默认参数
+DEFAULT_POOL_CAPACITY = 65536  # 所有发射器同时存活的物体上限
+DEFAULT_PARTICLE_RADIUS = 1.0  # 发射物体的默认半径，单位：米
+
+
+class Emitter:
+    """以固定速率持续生成物体的发射器
+
+    position 为发射口中心，area = (宽, 高) 为发射口大小，物体在其中均匀随机出现；
+    初速度为 velocity 加上标准差为 spread 的随机扰动；lifetime 秒后物体被回收（inf 表示不限）。
+    """
+
+    def __init__(self, position, rate, velocity=(0.0, 0.0), spread=0.0, area=(0.0, 0.0),
+                 radius=DEFAULT_PARTICLE_RADIUS, mass=1.0, restitution=REBOUND_COEFFICIENT,
+                 lifetime=np.inf):
+        self.position = np.asarray(position, dtype=np.float64)
+        self.rate = rate  # 每秒生成的物体数
+        self.velocity = np.asarray(velocity, dtype=np.float64)
+        self.spread = spread
+        self.area = np.asarray(area, dtype=np.float64)
+        self.radius = radius
+        self.mass = mass
+        self.restitution = restitution
+        self.lifetime = lifetime
+        self.enabled = True
+        self._pending = 0.0  # 按速率累计、还没生成的小数部分
+
+
+class EmitterSystem:
+    """发射器集合，以及它们生成的物体的池
+
+    挂到 world.emitters 上（attach）后，每步开始时先回收寿命到期或进入回收区的物体，
+    再按各发射器的速率生成新物体。物体本身就是 World 数组里的普通物体：
+    attach 时按池容量一次性预留好数组，生成只是从 count 往后取空闲槽位，
+    回收通过 World.remove_bodies 用末尾的物体填补空位，整个过程不会重新分配数组，
+    也不为单个物体创建 Python 对象。
+
+    池自己维护一个紧凑的活动集合：rows[:live] 是存活的发射物体编号，expires 是对应的回收时刻。
+    回收时用布尔掩码把幸存者压缩回前缀，检查只涉及发射出的物体，与世界里的其他物体数量无关。
+    """
+
+    def __init__(self, capacity=DEFAULT_POOL_CAPACITY, seed=None):
+        self.capacity = capacity
+        self.emitters = []
+        self.despawn_zones = np.zeros((0, 4))  # 回收区 (x0, y0, x1, y1)
+        self.rows = np.zeros(capacity, dtype=np.int64)
+        self.expires = np.zeros(capacity)
+        self.live = 0
+        self.spawned = 0  # 累计生成数
+        self.despawned = 0  # 累计回收数
+        self.dropped = 0  # 池满时没有生成的物体数
+        self._rng = np.random.default_rng(seed)
+
+    def attach(self, world):
+        """挂到 world 上，并按池容量预留数组"""
+        world.emitters = self
+        world.reserve(world.count + self.capacity - self.live)
+        return self
+
+    def add_emitter(self, position, rate, **kwargs):
+        """添加发射器，参数见 Emitter，返回新发射器"""
+        emitter = Emitter(position, rate, **kwargs)
+        self.emitters.append(emitter)
+        return emitter
+
+    def add_despawn_zone(self, rect):
+        """添加回收区 rect = (x0, y0, x1, y1)，进入其中的发射物体会被回收"""
+        self.despawn_zones = np.vstack([self.despawn_zones, rect])
+
+    def reset(self):
+        """清空活动集合（World.clear 时调用，物体已随 World 一起移除）"""
+        self.live = 0
+        for emitter in self.emitters:
+            emitter._pending = 0.0
+
+    def remap_bodies(self, remap):
+        """物体被移除或移动后更新活动集合中的编号，被其他代码移除的物体从集合中去掉"""
+        live = self.live
+        if not live:
+            return
+        rows = remap(self.rows[:live])
+        alive = rows >= 0
+        k = int(alive.sum())
+        self.rows[:k] = rows[alive]
+        self.expires[:k] = self.expires[:live][alive]
+        self.live = k
+
+    def update(self, world, dt):
+        """每步开始时由 World.step 调用：先回收再生成"""
+        self._despawn(world)
+        self._spawn(world, dt)
+
+    def _despawn(self, world):
+        live = self.live
+        if not live:
+            return
+        rows = self.rows[:live]
+        dead = self.expires[:live] <= world.time_elapsed
+        if len(self.despawn_zones):
+            pos = world.pos[rows]
+            for x0, y0, x1, y1 in self.despawn_zones:
+                dead |= (pos[:, 0] >= x0) & (pos[:, 0] <= x1) & (pos[:, 1] >= y0) & (pos[:, 1] <= y1)
+        if not dead.any():
+            return
+        victims = rows[dead]
+        if world.events is not None:
+            speed = np.hypot(world.vel[victims, 0], world.vel[victims, 1])
+            world.events.emit_many(DESPAWN, victims, world.time_elapsed, speed, world.pos[victims])
+        self.despawned += len(victims)
+        # 先把受害者移出活动集合，remove_bodies 回调 remap_bodies 时只需更新被移动的幸存者
+        alive = ~dead
+        k = int(alive.sum())
+        self.rows[:k] = rows[alive]
+        self.expires[:k] = self.expires[:live][alive]
+        self.live = k
+        world.remove_bodies(victims)
+
+    def _spawn(self, world, dt):
+        time = world.time_elapsed
+        for emitter in self.emitters:
+            if not emitter.enabled:
+                continue
+            emitter._pending += emitter.rate * dt
+            k = int(emitter._pending)
+            emitter._pending -= k
+            room = self.capacity - self.live
+            if k > room:
+                self.dropped += k - room
+                k = room
+            if not k:
+                continue
+            index = world.allocate_bodies(k, emitter.radius, emitter.mass, emitter.restitution)
+            vel = np.broadcast_to(emitter.velocity, (k, 2))
+            if emitter.spread:
+                vel = vel + self._rng.normal(0.0, emitter.spread, (k, 2))
+            # 同一步生成的物体按各自在步内的出生时刻沿初速度错开，避免成团出现
+            lag = self._rng.random(k)
+            world.pos[index] = emitter.position + (self._rng.random((k, 2)) - 0.5) * emitter.area
+            world.pos[index] += vel * (lag * dt)[:, None]
+            world.vel[index] = vel
+
+            start = self.live
+            self.rows[start:start + k] = np.arange(index.start, index.stop)
+            self.expires[start:start + k] = time + emitter.lifetime - lag * dt
+            self.live += k
+            self.spawned += k
+            if world.events is not None:
+                world.events.emit_many(SPAWN, self.rows[start:start + k], time,
+                                       np.hypot(vel[:, 0], vel[:, 1]), world.pos[index])
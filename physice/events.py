@@ -0,0 +1,166 @@
+import queue
+import sys
+import threading
+
+import numpy as np
+
+# 事件类型
+CONTACT = 0  # 撞击地面或静态几何
+WALL = 1  # 撞击左右墙
+REST = 2  # 物体静止下来
+WAKE = 3  # 静止的物体重新运动
+RELEASE = 4  # 拖动结束、物体被抛出
+SPAWN = 5  # 发射器生成物体
+DESPAWN = 6  # 发射器回收物体（寿命到期或进入回收区），编号为回收前的编号
+
+EVENT_NAMES = {
+    CONTACT: "contact",
+    WALL: "wall",
+    REST: "rest",
+    WAKE: "wake",
+    RELEASE: "release",
+    SPAWN: "spawn",
+    DESPAWN: "despawn",
+}
+
+# 每条事件的存储格式：类型、物体编号、模拟时间、速度（撞击速度或抛出速度）、位置
+EVENT_DTYPE = np.dtype([
+    ("kind", np.uint8),
+    ("body", np.int32),
+    ("time", np.float64),
+    ("speed", np.float32),
+    ("x", np.float32),
+    ("y", np.float32),
+])
+
+DEFAULT_BATCH_CAPACITY = 65536  # 每步最多记录的事件数
+DEFAULT_POOL_SIZE = 8  # 预分配的批次缓冲区个数
+
+
+class EventStream:
+    """物理线程产生、其他线程消费的事件流
+
+    物理线程每一步把事件写进一块预分配的结构化数组（批量写入，不做格式化和 IO），
+    步进结束时 commit() 把这块缓冲区交给队列，换一块空闲缓冲区继续写。
+    消费者用 batches()/events() 生成器或 subscribe() 回调在自己的线程里处理，
+    处理完后缓冲区回到空闲池。消费者跟不上时丢弃整批事件并计数，物理线程从不阻塞。
+    """
+
+    def __init__(self, batch_capacity=DEFAULT_BATCH_CAPACITY, pool_size=DEFAULT_POOL_SIZE):
+        self.batch_capacity = batch_capacity
+        self._free = queue.SimpleQueue()
+        for _ in range(pool_size - 1):
+            self._free.put(np.zeros(batch_capacity, dtype=EVENT_DTYPE))
+        self._ready = queue.SimpleQueue()
+        self._buffer = np.zeros(batch_capacity, dtype=EVENT_DTYPE)
+        self._size = 0
+        self.dropped = 0  # 因缓冲区满或消费者跟不上而丢弃的事件数
+        self._subscribers = []
+        self._dispatcher = None
+
+    def emit(self, kind, body, time, speed=0.0, x=0.0, y=0.0):
+        """记录单个事件（例如拖动结束），需要在与 step 相同的锁内调用"""
+        if self._size >= self.batch_capacity:
+            self.dropped += 1
+            return
+        self._buffer[self._size] = (kind, body, time, speed, x, y)
+        self._size += 1
+
+    def emit_many(self, kind, bodies, time, speed, pos):
+        """批量记录同一类型的事件，bodies/speed/pos 为等长数组"""
+        k = len(bodies)
+        if not k:
+            return
+        room = self.batch_capacity - self._size
+        if k > room:
+            self.dropped += k - room
+            k = room
+        batch = self._buffer[self._size:self._size + k]
+        batch["kind"] = kind
+        batch["body"] = bodies[:k]
+        batch["time"] = time
+        batch["speed"] = speed[:k]
+        batch["x"] = pos[:k, 0]
+        batch["y"] = pos[:k, 1]
+        self._size += k
+
+    def commit(self):
+        """结束本步：把已写入的事件交给消费者，换一块空闲缓冲区"""
+        if not self._size:
+            return
+        try:
+            free = self._free.get_nowait()
+        except queue.Empty:
+            # 消费者跟不上，丢弃本批并复用当前缓冲区
+            self.dropped += self._size
+            self._size = 0
+            return
+        self._ready.put((self._buffer, self._size))
+        self._buffer = free
+        self._size = 0
+
+    def batches(self, timeout=None):
+        """生成器：逐批返回事件数组（结构化数组视图），在消费者线程中使用
+
+        返回的数组在下一次迭代时会被回收复用，需要保留时请 copy()。
+        timeout 秒内没有新事件时结束迭代。
+        """
+        previous = None
+        try:
+            while True:
+                try:
+                    buffer, size = self._ready.get(timeout=timeout)
+                except queue.Empty:
+                    return
+                if previous is not None:
+                    self._free.put(previous)
+                previous = buffer
+                yield buffer[:size]
+        finally:
+            if previous is not None:
+                self._free.put(previous)
+
+    def events(self, timeout=None):
+        """生成器：逐条返回 (事件名, 物体编号, 时间, 速度, x, y)"""
+        for batch in self.batches(timeout):
+            for kind, body, time, speed, x, y in batch.tolist():
+                yield EVENT_NAMES[kind], body, time, speed, x, y
+
+    def subscribe(self, callback, kinds=None):
+        """注册回调 callback(batch)，在后台分发线程中按批调用
+
+        kinds 为事件类型集合时只传入这些类型的事件。第一次订阅时启动分发线程。
+        """
+        kinds = None if kinds is None else np.fromiter(kinds, dtype=np.uint8)
+        self._subscribers.append((callback, kinds))
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch(self):
+        for batch in self.batches():
+            for callback, kinds in self._subscribers:
+                selected = batch if kinds is None else batch[np.isin(batch["kind"], kinds)]
+                if len(selected):
+                    callback(selected)
+
+
+class AsyncLogWriter:
+    """把事件格式化成文本写入文件，格式化和 IO 都在分发线程里完成，不占用物理线程
+
+    formatter(event) 接收一条事件记录，返回一行文本；默认输出事件名、物体、时间和速度。
+    """
+
+    def __init__(self, stream, file=None, kinds=None, formatter=None):
+        self.file = sys.stdout if file is None else file
+        self.formatter = formatter or self.default_format
+        stream.subscribe(self.write, kinds)
+
+    @staticmethod
+    def default_format(event):
+        return (f"{EVENT_NAMES[event['kind']]} body={event['body']} "
+                f"t={event['time']:.2f}s v={event['speed']:.2f}m/s")
+
+    def write(self, batch):
+        self.file.write("".join(self.formatter(event) + "\n" for event in batch))
+        self.file.flush()
@@ -0,0 +1,255 @@
+import numpy as np
+
+# 力场默认参数
+GRAVITY = 9.8  # 重力加速度，单位：m/s²
+AIR_DENSITY = 1.2  # 空气密度，单位：kg/m³
+SOFTENING = 1.0  # 吸引子软化半径，避免距离趋近 0 时力发散
+
+
+class ForceField:
+    """力场基类
+
+    子类实现 apply(world, index)，把本力场的力累加到 world.force[index] 上。
+    index 是 slice(0, count) 或物体索引数组（细节层次步进时只更新一部分物体）。
+    所有计算都是对整个数组的向量化运算，不对单个物体调用 Python 回调。
+    """
+
+    enabled = True
+
+    def apply(self, world, index):
+        raise NotImplementedError
+
+    def potential_energy(self, world, n):
+        """前 n 个物体在本力场中的总势能，非保守力（阻力、风）返回 0"""
+        return 0.0
+
+    def remap_bodies(self, remap):
+        """物体被移除或移动后更新保存的物体编号（见 World.remove_bodies），不保存编号的力场什么都不做"""
+
+    def coupled_bodies(self):
+        """细节层次步进时必须每步和近处物体一起更新的物体编号，None 表示没有
+
+        力依赖其他物体当前状态的力场（如弹簧）返回相互耦合的物体，
+        避免两端用不同步长补步、按过时的位置计算力。
+        """
+        return None
+
+
+def _zone_mask(pos, zone):
+    """返回位于矩形区域 (x0, y0, x1, y1) 内的物体掩码，zone 为 None 时表示全局"""
+    if zone is None:
+        return None
+    x0, y0, x1, y1 = zone
+    x = pos[:, 0]
+    y = pos[:, 1]
+    return (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+
+
+class Gravity(ForceField):
+    """均匀重力场，F = m * g"""
+
+    def __init__(self, gravity=GRAVITY):
+        self.gravity = gravity
+
+    def apply(self, world, index):
+        world.force[index, 1] -= world.mass[index] * self.gravity
+
+    def potential_energy(self, world, n):
+        return self.gravity * np.dot(world.mass[:n], world.pos[:n, 1])
+
+
+class LinearDrag(ForceField):
+    """线性空气阻力，F = -k * v，适合低速小物体"""
+
+    def __init__(self, coefficient=0.1):
+        self.coefficient = coefficient
+
+    def apply(self, world, index):
+        world.force[index] -= self.coefficient * world.vel[index]
+
+
+class QuadraticDrag(ForceField):
+    """二次空气阻力，F = -0.5 * rho * Cd * A * |v| * v，A 取物体截面直径"""
+
+    def __init__(self, drag_coefficient=0.47, density=AIR_DENSITY):
+        self.drag_coefficient = drag_coefficient
+        self.density = density
+
+    def apply(self, world, index):
+        vel = world.vel[index]
+        speed = np.hypot(vel[:, 0], vel[:, 1])
+        # 二维情况下截面积退化为直径
+        speed *= world.radius[index]
+        speed *= self.density * self.drag_coefficient
+        world.force[index] -= speed[:, None] * vel
+
+
+class UniformWind(ForceField):
+    """均匀风场：按相对风速施加线性阻力，F = k * (w - v)
+
+    zone 为 (x0, y0, x1, y1) 时只作用于区域内的物体。
+    """
+
+    def __init__(self, velocity=(5.0, 0.0), coefficient=0.5, zone=None):
+        self.velocity = np.asarray(velocity, dtype=np.float64)
+        self.coefficient = coefficient
+        self.zone = zone
+
+    def wind_at(self, pos, t):
+        return self.velocity
+
+    def apply(self, world, index):
+        pos = world.pos[index]
+        relative = self.wind_at(pos, world.time_elapsed) - world.vel[index]
+        relative *= self.coefficient
+        mask = _zone_mask(pos, self.zone)
+        if mask is None:
+            world.force[index] += relative
+        else:
+            rows = np.arange(world.count)[index][mask]
+            world.force[rows] += relative[mask]
+
+
+class TurbulentWind(UniformWind):
+    """湍流风场：在均匀风速上叠加随位置和时间变化的正弦扰动
+
+    用几组不同波长、相位的正弦波叠加近似湍流，全部是逐元素的向量运算。
+    """
+
+    def __init__(self, velocity=(5.0, 0.0), coefficient=0.5, zone=None,
+                 amplitude=3.0, wavelength=40.0, frequency=0.5, octaves=3, seed=0):
+        super().__init__(velocity, coefficient, zone)
+        self.amplitude = amplitude
+        rng = np.random.default_rng(seed)
+        # 每一层：波矢 (kx, ky)、角频率、相位，逐层波长减半、幅度减半
+        scales = 2.0 ** np.arange(octaves)
+        angles = rng.uniform(0.0, 2.0 * np.pi, octaves)
+        k = 2.0 * np.pi / wavelength * scales
+        self._kx = k * np.cos(angles)
+        self._ky = k * np.sin(angles)
+        self._omega = 2.0 * np.pi * frequency * scales
+        self._phase = rng.uniform(0.0, 2.0 * np.pi, (2, octaves))
+        self._weight = 1.0 / scales
+
+    def wind_at(self, pos, t):
+        wind = np.empty_like(pos)
+        wind[:] = self.velocity
+        x = pos[:, 0]
+        y = pos[:, 1]
+        for o in range(len(self._kx)):
+            arg = self._kx[o] * x + self._ky[o] * y + self._omega[o] * t
+            scale = self.amplitude * self._weight[o]
+            wind[:, 0] += scale * np.sin(arg + self._phase[0, o])
+            wind[:, 1] += scale * np.cos(arg + self._phase[1, o])
+        return wind
+
+
+class PointAttractor(ForceField):
+    """点吸引子：F = m * strength * d / (|d|² + ε²)^(3/2)，strength 为负时表现为排斥"""
+
+    def __init__(self, center=(0.0, 0.0), strength=500.0, softening=SOFTENING, radius=None):
+        self.center = np.asarray(center, dtype=np.float64)
+        self.strength = strength
+        self.softening = softening
+        self.radius = radius  # 作用半径，None 表示无限远
+
+    def apply(self, world, index):
+        d = self.center - world.pos[index]
+        dist2 = np.einsum("ij,ij->i", d, d)
+        inv = dist2 + self.softening * self.softening
+        inv **= -1.5
+        inv *= self.strength * world.mass[index]
+        if self.radius is not None:
+            inv[dist2 > self.radius * self.radius] = 0.0
+        world.force[index] += inv[:, None] * d
+
+    def potential_energy(self, world, n):
+        # 忽略作用半径截断，按无截断的软化势 -m * strength / sqrt(|d|² + ε²) 计算
+        d = self.center - world.pos[:n]
+        dist2 = np.einsum("ij,ij->i", d, d)
+        dist2 += self.softening * self.softening
+        return -self.strength * np.dot(world.mass[:n], dist2 ** -0.5)
+
+
+class SpringSet(ForceField):
+    """物体之间的阻尼弹簧集合
+
+    弹簧以边索引数组 (i, j) 存储，每步对所有弹簧一次性计算，
+    再用 np.bincount 把力散射回两端的物体。弹簧总是整体计算，忽略 index：
+    写到本次不更新的物体上的力会在它们下次步进前被清零。
+    细节层次步进时连有弹簧的物体每步都和近处物体一起更新（见 coupled_bodies）。
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """移除所有弹簧"""
+        self.i = np.zeros(0, dtype=np.int64)
+        self.j = np.zeros(0, dtype=np.int64)
+        self.rest_length = np.zeros(0)
+        self.stiffness = np.zeros(0)
+        self.damping = np.zeros(0)
+
+    def __len__(self):
+        return len(self.i)
+
+    def add(self, i, j, rest_length, stiffness=100.0, damping=1.0):
+        """添加一根或一批弹簧，参数可以是标量或等长数组"""
+        i, j, rest_length, stiffness, damping = np.broadcast_arrays(
+            np.atleast_1d(i), np.atleast_1d(j), np.atleast_1d(rest_length),
+            np.atleast_1d(stiffness), np.atleast_1d(damping))
+        self.i = np.concatenate([self.i, i.astype(np.int64)])
+        self.j = np.concatenate([self.j, j.astype(np.int64)])
+        self.rest_length = np.concatenate([self.rest_length, rest_length.astype(np.float64)])
+        self.stiffness = np.concatenate([self.stiffness, stiffness.astype(np.float64)])
+        self.damping = np.concatenate([self.damping, damping.astype(np.float64)])
+
+    def connect(self, world, i, j, stiffness=100.0, damping=1.0):
+        """按物体当前距离作为静止长度连接弹簧"""
+        i = np.atleast_1d(i)
+        j = np.atleast_1d(j)
+        d = world.pos[j] - world.pos[i]
+        self.add(i, j, np.hypot(d[:, 0], d[:, 1]), stiffness, damping)
+
+    def apply(self, world, index):
+        if not len(self.i):
+            return
+        n = world.count
+        i = self.i
+        j = self.j
+        d = world.pos[j] - world.pos[i]
+        length = np.hypot(d[:, 0], d[:, 1])
+        np.maximum(length, 1e-9, out=length)
+        d /= length[:, None]
+        dv = world.vel[j] - world.vel[i]
+        magnitude = self.stiffness * (length - self.rest_length)
+        magnitude += self.damping * np.einsum("ij,ij->i", dv, d)
+        d *= magnitude[:, None]
+        for axis in range(2):
+            world.force[:n, axis] += np.bincount(i, weights=d[:, axis], minlength=n)
+            world.force[:n, axis] -= np.bincount(j, weights=d[:, axis], minlength=n)
+
+    def coupled_bodies(self):
+        """所有连有弹簧的物体编号（排序去重）"""
+        return np.union1d(self.i, self.j) if len(self.i) else None
+
+    def remap_bodies(self, remap):
+        """更新弹簧两端的物体编号，一端被移除的弹簧一起移除"""
+        if not len(self.i):
+            return
+        i = remap(self.i)
+        j = remap(self.j)
+        keep = (i >= 0) & (j >= 0)
+        self.i = i[keep]
+        self.j = j[keep]
+        self.rest_length = self.rest_length[keep]
+        self.stiffness = self.stiffness[keep]
+        self.damping = self.damping[keep]
+
+    def potential_energy(self, world, n):
+        if not len(self.i):
+            return 0.0
+        d = world.pos[self.j] - world.pos[self.i]
+        stretch = np.hypot(d[:, 0], d[:, 1]) - self.rest_length
+        return 0.5 * np.dot(self.stiffness, stretch * stretch)
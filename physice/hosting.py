@@ -0,0 +1,168 @@
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# 多世界托管默认参数
+DEFAULT_BATCH_SIZE = 32  # 每个线程池任务依次步进的世界数
+DEFAULT_BUDGET = 0.002  # 每个世界每轮允许占用的计算时间，单位：秒
+MAX_CREDIT_ROUNDS = 4  # 预算最多累积几轮，空闲过的世界不能一次性占用太多时间
+
+
+class WorldSession:
+    """托管中的一个世界及其调度状态
+
+    修改 world（添加物体、拖动等）时需要持有 lock，与线程池中的步进互斥。
+    """
+
+    def __init__(self, session_id, world, time_step, budget):
+        self.id = session_id
+        self.world = world
+        self.time_step = time_step
+        self.budget = budget
+        self.lock = threading.Lock()
+        self.paused = False
+        self.credit = budget  # 剩余的计算时间额度，小于等于 0 时本轮跳过
+        self.steps = 0
+        self.skipped = 0  # 因超出预算被跳过的轮数
+        self.last_cost = 0.0  # 最近一次步进耗时（秒）
+        self.total_cost = 0.0
+        self.error = None  # 步进时抛出的异常，出错的世界不再调度
+
+
+class WorldManager:
+    """在一个进程里托管大量互不相关的无窗口世界，用共享线程池分批步进
+
+    每一轮（tick）把需要步进的世界按固定大小分批，每批作为一个任务交给线程池，
+    任务内依次步进这一批世界；线程数固定为 workers，与世界数量无关。
+    numpy 的大数组运算会释放 GIL，物体多的世界可以在多个线程上真正并行，
+    小世界则主要受 Python 开销限制，批处理让每个任务的调度开销分摊到多个世界上。
+
+    调度采用按时间预算的亏空轮转：每个世界每轮获得 budget 秒的额度，
+    步进的实际耗时从额度中扣除，额度用完的世界跳过若干轮，直到额度恢复为正。
+    昂贵的世界因此只会被降速，不会挤占其他世界的时间；每轮的处理顺序轮换，
+    不会总是同一批世界排在最后。
+    """
+
+    def __init__(self, workers=None, batch_size=DEFAULT_BATCH_SIZE, budget=DEFAULT_BUDGET,
+                 time_step=1 / 60):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.budget = budget
+        self.time_step = time_step
+        self.sessions = {}
+        self.rounds = 0
+        self.last_round_time = 0.0  # 最近一轮的墙钟耗时（秒）
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="physice-world")
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self.sessions
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, world, time_step=None, budget=None):
+        """托管一个世界，返回会话编号"""
+        session_id = next(self._ids)
+        session = WorldSession(session_id, world, time_step or self.time_step,
+                               self.budget if budget is None else budget)
+        with self._lock:
+            self.sessions[session_id] = session
+        return session_id
+
+    def remove(self, session_id):
+        """停止托管并返回该世界，正在步进时等这一步结束"""
+        with self._lock:
+            session = self.sessions.pop(session_id)
+        with session.lock:
+            return session.world
+
+    def session(self, session_id):
+        return self.sessions[session_id]
+
+    def tick(self):
+        """步进一轮：所有额度为正且未暂停的世界各推进一个时间步，返回本轮步进的世界数"""
+        start = time.perf_counter()
+        with self._lock:
+            sessions = list(self.sessions.values())
+        # 轮换起点，批次内的先后顺序在各世界之间轮流
+        if sessions:
+            offset = self.rounds % len(sessions)
+            sessions = sessions[offset:] + sessions[:offset]
+        due = []
+        for session in sessions:
+            if session.paused or session.error is not None:
+                continue
+            session.credit = min(session.credit + session.budget, session.budget * MAX_CREDIT_ROUNDS)
+            if session.credit <= 0.0:
+                session.skipped += 1
+                continue
+            due.append(session)
+
+        batches = [due[k:k + self.batch_size] for k in range(0, len(due), self.batch_size)]
+        if len(batches) == 1 or self.workers == 1:
+            # 只有一批或只有一个线程时直接在当前线程执行，省去线程切换
+            for batch in batches:
+                self._step_batch(batch)
+        else:
+            wait([self._executor.submit(self._step_batch, batch) for batch in batches])
+        self.rounds += 1
+        self.last_round_time = time.perf_counter() - start
+        return len(due)
+
+    @staticmethod
+    def _step_batch(batch):
+        clock = time.perf_counter
+        for session in batch:
+            with session.lock:
+                begin = clock()
+                try:
+                    session.world.step(session.time_step)
+                except Exception as error:  # 一个会话出错不影响其他会话
+                    session.error = error
+                    continue
+                cost = clock() - begin
+            session.credit -= cost
+            session.last_cost = cost
+            session.total_cost += cost
+            session.steps += 1
+
+    def run(self, duration=None, rate=None):
+        """按固定频率循环 tick，rate 默认与 time_step 对应（实时运行），duration 为 None 时一直运行
+
+        一轮耗时超过周期时不补跑，下一轮立即开始。
+        """
+        period = 1.0 / rate if rate else self.time_step
+        start = time.monotonic()
+        next_round = start
+        while duration is None or time.monotonic() - start < duration:
+            self.tick()
+            next_round = max(next_round + period, time.monotonic())
+            time.sleep(max(next_round - time.monotonic(), 0.0))
+
+    def stats(self):
+        """汇总统计：世界数、本轮耗时、跳过次数、出错的会话等"""
+        sessions = list(self.sessions.values())
+        costs = [session.last_cost for session in sessions]
+        return {
+            "worlds": len(sessions),
+            "rounds": self.rounds,
+            "round_time": self.last_round_time,
+            "mean_cost": sum(costs) / len(costs) if costs else 0.0,
+            "max_cost": max(costs, default=0.0),
+            "throttled": sum(session.credit <= 0.0 for session in sessions),
+            "skipped": sum(session.skipped for session in sessions),
+            "errors": [session.id for session in sessions if session.error is not None],
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,376 @@
+import multiprocessing
+import os
+import threading
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from physice.world import World
+
+# 并行模式默认参数
+DEFAULT_EXCHANGE_CAPACITY = 1 << 16  # 每步每侧最多交换的迁移物体 / 幽灵物体数
+CAPACITY_SLACK = 1.5  # 每个进程的世界按初始物体数的多少倍预留容量
+
+# 物体在进程之间传递时的记录格式（始终用双精度，float32 世界来回转换也不损失精度）
+BODY_DTYPE = np.dtype([
+    ("id", np.int64),  # 原世界中的编号，汇总结果时按它放回原位置
+    ("pos", np.float64, 2),
+    ("vel", np.float64, 2),
+    ("radius", np.float64),
+    ("mass", np.float64),
+    ("inv_mass", np.float64),
+    ("restitution", np.float64),
+    ("rebound_count", np.uint32),
+    ("still_steps", np.uint8),
+    ("flags", np.uint8),
+])
+_FIELDS = BODY_DTYPE.names[1:]
+
+CONTROL_DTYPE = np.dtype([("command", np.int64), ("steps", np.int64), ("dt", np.float64)])
+
+# 控制命令
+_STEP = 0
+_GATHER = 1
+_STOP = 2
+
+# 交换缓冲区的下标：种类（迁移 / 幽灵）和方向（左 / 右）
+_MIGRANT = 0
+_GHOST = 1
+_LEFT = 0
+_RIGHT = 1
+
+
+def _layout(workers, count, capacity):
+    """共享内存中各数组的 (名字, 形状, 类型)，主进程和工作进程按同一布局解释同一块内存"""
+    return [
+        ("state", (count,), BODY_DTYPE),  # 按原编号存放的全部物体，初始化和汇总时使用
+        ("exchange", (workers, 2, 2, capacity), BODY_DTYPE),
+        ("exchange_count", (workers, 2, 2), np.int64),
+        ("owned", (workers,), np.int64),  # 每个进程当前负责的物体数
+        ("overflow", (workers, 2), np.int64),  # 每个进程因缓冲区满没能发出的迁移 / 幽灵物体累计数
+        ("control", (1,), CONTROL_DTYPE),
+    ]
+
+
+def _offsets(layout):
+    """各数组在共享内存中的起始位置（按 64 字节对齐）和总字节数"""
+    offsets = []
+    offset = 0
+    for _, shape, dtype in layout:
+        offsets.append(offset)
+        offset += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 64) * 64
+    return offsets, offset
+
+
+def _map_arrays(buffer, layout):
+    offsets, _ = _offsets(layout)
+    return {name: np.ndarray(shape, dtype, buffer, offset)
+            for (name, shape, dtype), offset in zip(layout, offsets)}
+
+
+def _pack(world, ids, rows, out):
+    """把 world 中 rows 对应物体写成记录"""
+    out["id"] = ids[rows]
+    for name in _FIELDS:
+        out[name] = getattr(world, name)[rows]
+
+
+def _unpack(world, ids, records):
+    """把记录追加到 world 末尾，返回 (新物体的切片, 扩容后的 ids)"""
+    index = world.allocate_bodies(len(records))
+    for name in _FIELDS:
+        getattr(world, name)[index] = records[name]
+    if len(ids) < world.capacity:
+        ids = np.resize(ids, world.capacity)
+    ids[index] = records["id"]
+    return index, ids
+
+
+def _lookup(table):
+    """按表查找编号的 remap 函数，超出表范围的编号（静态接触对象）返回 -1"""
+    last = len(table) - 1
+
+    def remap(rows):
+        return np.where(rows <= last, table[np.minimum(rows, last)], -1)
+    return remap
+
+
+class ParallelWorld:
+    """把一个大世界按 x 方向切成竖条（slab），每个工作进程负责一条
+
+    每个进程持有一个只包含本条物体的 World，照常向量化步进；每步之后越过边界的物体
+    通过共享内存交给相邻进程（迁移），挂了接触求解器时，边界两侧 halo 宽度内的物体
+    在步进前复制给相邻进程作为幽灵物体，只参与接触求解，步进后丢弃。
+    所有交换都在固定大小的共享内存缓冲区中完成，进程之间只用屏障同步，不经过管道传数据。
+
+    没有接触求解器时物体之间互不影响，力场、地面、墙和静态几何都是逐个物体的运算，
+    结果与单进程逐位一致。有接触求解器时边界附近的接触由两侧各解一次：halo 默认为两倍接触距离，
+    内层幽灵物体与本条物体一起求解，外层按固定物体处理，替内层挡住本条的堆积压力；
+    接触缓存在步与步之间按原编号保存，跨边界的接触同样热启动。结果与单进程不逐位相同，
+    但穿透和静止堆积的稳定性相当。弹簧、软体、发射器、细节层次和事件流在并行模式下不可用。
+
+    切分位置取初始 x 坐标的分位数，每条的物体数大致相等。
+    """
+
+    def __init__(self, world, workers=None, halo=None, exchange_capacity=DEFAULT_EXCHANGE_CAPACITY):
+        for name in ("soft_bodies", "emitters", "lod_view", "events", "diagnostics"):
+            if getattr(world, name) is not None:
+                raise ValueError(f"并行模式不支持 {name}")
+        if any(len(getattr(field, "i", ())) for field in world.force_fields):
+            raise ValueError("并行模式不支持弹簧")
+        self.workers = workers or os.cpu_count() or 1
+        self.count = n = world.count
+        self.time_elapsed = world.time_elapsed
+        self.dtype = world.dtype
+        if halo is None:
+            solver = world.contact_solver
+            # 两层接触距离：内层幽灵物体直接与本条物体接触，外层固定不动，支撑内层
+            halo = 0.0 if solver is None or not n else 2.0 * (2.0 * float(world.radius[:n].max()) + solver.margin)
+        self.halo = halo
+
+        layout = _layout(self.workers, n, exchange_capacity)
+        self._memory = shared_memory.SharedMemory(create=True, size=max(_offsets(layout)[1], 1))
+        self._arrays = _map_arrays(self._memory.buf, layout)
+        state = self._arrays["state"]
+        state["id"] = np.arange(n)
+        _pack(world, np.arange(n), slice(0, n), state)
+
+        # 按初始 x 的分位数切分，最外两条延伸到无穷远
+        x = world.pos[:n, 0]
+        inner = np.quantile(x, np.arange(1, self.workers) / self.workers) if n else np.zeros(self.workers - 1)
+        self.bounds = np.concatenate([[-np.inf], inner, [np.inf]])
+
+        # 工作进程用的世界模板：只带设置，不带物体
+        template = World(capacity=1, width=world.width, dtype=world.dtype)
+        template.force_fields = world.force_fields
+        template.static_geometry = world.static_geometry
+        template.contact_solver = world.contact_solver
+        template.time_elapsed = world.time_elapsed
+
+        context = multiprocessing.get_context("spawn")
+        self._sync = context.Barrier(self.workers + 1)  # 主进程与所有工作进程
+        self._exchange = context.Barrier(self.workers)  # 工作进程之间
+        self._processes = [
+            context.Process(target=_worker, daemon=True,
+                            args=(rank, self._memory.name, layout, self.bounds, self.halo, template,
+                                  self._sync, self._exchange))
+            for rank in range(self.workers)
+        ]
+        for process in self._processes:
+            process.start()
+        try:
+            self._wait()  # 等所有进程载入各自的物体
+        except RuntimeError:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def owned(self):
+        """每个进程当前负责的物体数（负载分布）"""
+        return self._arrays["owned"].copy()
+
+    @property
+    def overflow(self):
+        """交换缓冲区满时没能发出的物体累计数：(迁移, 幽灵)，各进程之和
+
+        没发出的迁移物体留在原来的进程，下一步再尝试；没发出的幽灵物体这一步与邻居的接触丢失。
+        不为 0 时应增大 exchange_capacity。
+        """
+        migrants, ghosts = self._arrays["overflow"].sum(axis=0)
+        return int(migrants), int(ghosts)
+
+    def _command(self, command, steps=0, dt=0.0):
+        self._arrays["control"][0] = (command, steps, dt)
+        self._wait()
+        self._wait()
+
+    def _wait(self):
+        try:
+            self._sync.wait()
+        except threading.BrokenBarrierError:
+            raise RuntimeError("并行工作进程出错，详见其错误输出") from None
+
+    def step(self, dt, steps=1):
+        """所有进程同步推进 steps 个时间步"""
+        self._command(_STEP, steps, dt)
+        self.time_elapsed += dt * steps
+
+    def gather(self):
+        """让各进程把物体写回共享内存，返回按原编号排列的记录数组
+
+        返回的是共享内存的视图，不复制数据，下一次 gather 时会被覆盖。
+        """
+        self._command(_GATHER)
+        return self._arrays["state"]
+
+    def to_world(self):
+        """汇总成一个单进程 World（物体按原编号排列），用于绘制或与单进程结果对比"""
+        state = self.gather()
+        world = World(capacity=max(self.count, 1), dtype=self.dtype)
+        index = world.allocate_bodies(self.count)
+        for name in _FIELDS:
+            getattr(world, name)[index] = state[name]
+        world.time_elapsed = self.time_elapsed
+        return world
+
+    def close(self):
+        if self._processes:
+            try:
+                self._command(_STOP)
+            except RuntimeError:
+                pass
+            for process in self._processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            self._processes = []
+        if self._memory is not None:
+            self._arrays = None
+            try:
+                self._memory.close()
+            except BufferError:
+                pass  # 调用方还持有 gather() 返回的视图，内存在视图释放后回收
+            self._memory.unlink()
+            self._memory = None
+
+
+def _worker(rank, memory_name, layout, bounds, halo, world, sync, exchange):
+    """工作进程主循环：载入本条物体，然后按主进程的命令步进或汇总"""
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        arrays = _map_arrays(memory.buf, layout)
+        _Slab(rank, arrays, bounds, halo, world, exchange).serve(sync)
+    except Exception:
+        traceback.print_exc()
+        sync.abort()
+        exchange.abort()
+    finally:
+        arrays = None
+        memory.close()
+
+
+class _Slab:
+    """一个工作进程负责的竖条"""
+
+    def __init__(self, rank, arrays, bounds, halo, world, exchange):
+        self.rank = rank
+        self.arrays = arrays
+        self.lo = bounds[rank]
+        self.hi = bounds[rank + 1]
+        self.halo = halo
+        self.world = world
+        self.exchange = exchange
+        self.neighbors = {_LEFT: rank - 1 if rank > 0 else None,
+                          _RIGHT: rank + 1 if rank + 1 < len(bounds) - 1 else None}
+        self.capacity = arrays["exchange"].shape[-1]
+        self.local = np.full(len(arrays["state"]), -1, dtype=np.int64)  # 原编号 -> 本地行号，用完即复原
+
+        state = arrays["state"]
+        x = state["pos"][:, 0]
+        mine = state[(x >= self.lo) & (x < self.hi)]
+        world.reserve(int(len(mine) * CAPACITY_SLACK) + 2 * self.capacity)
+        self.ids = np.zeros(world.capacity, dtype=np.int64)
+        _, self.ids = _unpack(world, self.ids, mine)
+        self.arrays["owned"][rank] = world.count
+
+    def serve(self, sync):
+        control = self.arrays["control"]
+        sync.wait()
+        while True:
+            sync.wait()
+            command, steps, dt = control[0]
+            if command == _STEP:
+                for _ in range(steps):
+                    self.step(dt)
+                self.arrays["owned"][self.rank] = self.world.count
+            elif command == _GATHER:
+                # 各进程的物体编号互不重叠，可以同时按编号写回
+                n = self.world.count
+                records = np.empty(n, dtype=BODY_DTYPE)
+                _pack(self.world, self.ids, slice(0, n), records)
+                self.arrays["state"][records["id"]] = records
+            sync.wait()
+            if command == _STOP:
+                return
+
+    def _send(self, kind, side, rows):
+        """把 rows 写进发往 side 侧邻居的缓冲区，返回实际写入的行（缓冲区满时截断并计数）"""
+        if len(rows) > self.capacity:
+            self.arrays["overflow"][self.rank, kind] += len(rows) - self.capacity
+            rows = rows[:self.capacity]
+        _pack(self.world, self.ids, rows, self.arrays["exchange"][self.rank, kind, side, :len(rows)])
+        self.arrays["exchange_count"][self.rank, kind, side] = len(rows)
+        return rows
+
+    def _receive(self, kind):
+        """追加左右邻居发给本条的记录，返回追加的物体数"""
+        received = 0
+        for side, neighbor in self.neighbors.items():
+            if neighbor is None:
+                continue
+            # 左邻居发往右侧的、右邻居发往左侧的缓冲区
+            k = self.arrays["exchange_count"][neighbor, kind, 1 - side]
+            if k:
+                _, self.ids = _unpack(self.world, self.ids, self.arrays["exchange"][neighbor, kind, 1 - side, :k])
+                received += k
+        return received
+
+    def _localize(self, solver):
+        """把按原编号保存的接触缓存换回本地行号，本条中没有的物体对被丢弃"""
+        n = self.world.count
+        ids = self.ids[:n]
+        self.local[ids] = np.arange(n)
+        solver.remap_bodies(_lookup(self.local))
+        self.local[ids] = -1
+
+    def step(self, dt):
+        world = self.world
+        solver = world.contact_solver
+        # 1. 幽灵物体：把边界 halo 宽度内的物体复制给邻居，追加邻居发来的幽灵物体
+        own = world.count
+        if self.halo > 0.0:
+            x = world.pos[:own, 0]
+            for side, near in ((_LEFT, x < self.lo + self.halo), (_RIGHT, x >= self.hi - self.halo)):
+                if self.neighbors[side] is not None:
+                    self._send(_GHOST, side, np.flatnonzero(near))
+            self.exchange.wait()
+            self._receive(_GHOST)
+            # 外层幽灵物体（离边界超过半个 halo）按固定物体处理：它们的支撑在邻居那里，
+            # 这里缺少外侧的物体，若可以被推动，本条的堆积压力会把边界附近的物体挤进邻居
+            x = world.pos[own:world.count, 0]
+            outer = (x < self.lo - 0.5 * self.halo) | (x >= self.hi + 0.5 * self.halo)
+            world.inv_mass[own:world.count][outer] = 0.0
+        if solver is not None:
+            self._localize(solver)
+
+        # 2. 步进本条物体（连同幽灵物体），然后丢弃幽灵物体（在数组末尾，移除时不移动其他物体）
+        world.step(dt)
+        if solver is not None:
+            # 接触缓存在两步之间按原编号保存：幽灵物体每步换行号、物体迁移到邻居后，
+            # 与它们有关的接触仍能热启动。移除和迁移期间暂时摘下求解器，不让行号变化改写缓存
+            solver.remap_bodies(_lookup(self.ids[:world.count]))
+            world.contact_solver = None
+        if world.count > own:
+            world.remove_bodies(np.arange(own, world.count))
+
+        # 3. 迁移：越过边界的物体交给邻居，从本条移除
+        x = world.pos[:own, 0]
+        leaving = []
+        for side, out in ((_LEFT, x < self.lo), (_RIGHT, x >= self.hi)):
+            if self.neighbors[side] is not None:
+                leaving.append(self._send(_MIGRANT, side, np.flatnonzero(out)))
+        if leaving:
+            moved, holes = world.remove_bodies(np.concatenate(leaving))
+            self.ids[holes] = self.ids[moved]
+        self.exchange.wait()
+        self._receive(_MIGRANT)
+        world.contact_solver = solver
+        # 所有进程读完缓冲区后才能开始下一步的写入
+        self.exchange.wait()
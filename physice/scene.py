@@ -0,0 +1,240 @@
+import json
+import math
+import os
+
+import numpy as np
+
+from physice.colliders import StaticGeometry
+from physice.contacts import ContactSolver
+from physice.emitters import DEFAULT_PARTICLE_RADIUS, DEFAULT_POOL_CAPACITY, EmitterSystem
+from physice.forces import (
+    GRAVITY,
+    LinearDrag,
+    PointAttractor,
+    QuadraticDrag,
+    SpringSet,
+    TurbulentWind,
+    UniformWind,
+)
+from physice.softbody import SoftBodySet
+from physice.world import BALL_RADIUS, REBOUND_COEFFICIENT, WORLD_WIDTH, World
+
+
+class Material:
+    """物体材质：反弹系数和面密度（二维，kg/m²）
+
+    density 为 None 时物体质量直接取 mass 字段，否则按 density * π * r² 计算。
+    """
+
+    def __init__(self, restitution=REBOUND_COEFFICIENT, density=None):
+        self.restitution = restitution
+        self.density = density
+
+    def mass_of(self, radius, mass=1.0):
+        if self.density is None:
+            return mass
+        return self.density * math.pi * np.square(radius)
+
+
+DEFAULT_MATERIAL = Material()
+
+# 场景文件中力场类型名与类的对应关系
+FORCE_TYPES = {
+    "linear_drag": LinearDrag,
+    "quadratic_drag": QuadraticDrag,
+    "uniform_wind": UniformWind,
+    "turbulent_wind": TurbulentWind,
+    "attractor": PointAttractor,
+}
+
+
+def spawn_grid(world, origin, rows, cols, spacing, radius=BALL_RADIUS,
+               material=DEFAULT_MATERIAL, velocity=(0.0, 0.0)):
+    """在 origin 处按 rows x cols 的网格批量生成物体，返回索引切片"""
+    index = world.allocate_bodies(rows * cols, radius, material.mass_of(radius),
+                                  material.restitution)
+    spacing = np.broadcast_to(np.asarray(spacing, dtype=np.float64), 2)
+    k = np.arange(rows * cols)
+    world.pos[index, 0] = origin[0] + (k % cols) * spacing[0]
+    world.pos[index, 1] = origin[1] + (k // cols) * spacing[1]
+    world.vel[index] = velocity
+    return index
+
+
+def spawn_random(world, count, rect, radius=BALL_RADIUS, material=DEFAULT_MATERIAL,
+                 velocity=(0.0, 0.0), velocity_sigma=0.0, radius_range=None, seed=None):
+    """在矩形 rect = (x0, y0, x1, y1) 内均匀随机生成 count 个物体，返回索引切片
+
+    radius_range = (r0, r1) 时半径也在区间内均匀随机，质量按材质随半径变化。
+    """
+    rng = np.random.default_rng(seed)
+    x0, y0, x1, y1 = rect
+    if radius_range is not None:
+        radius = rng.uniform(radius_range[0], radius_range[1], count)
+    index = world.allocate_bodies(count, radius, material.mass_of(radius), material.restitution)
+    world.pos[index, 0] = rng.uniform(x0, x1, count)
+    world.pos[index, 1] = rng.uniform(y0, y1, count)
+    world.vel[index] = velocity
+    if velocity_sigma:
+        world.vel[index] += rng.normal(0.0, velocity_sigma, (count, 2))
+    return index
+
+
+def _spec_count(spec):
+    """场景中一个物体条目会生成多少个物体，用于提前一次性分配数组"""
+    kind = spec.get("type", "body")
+    if kind == "body":
+        return 1
+    if kind == "grid":
+        return spec["rows"] * spec["cols"]
+    if kind == "random":
+        return spec["count"]
+    raise ValueError(f"未知的物体类型: {kind}")
+
+
+def _load_colliders(specs, materials):
+    geometry = StaticGeometry()
+    for spec in specs:
+        kind = spec["type"]
+        restitution = spec.get("restitution", np.nan)
+        if "material" in spec:
+            restitution = materials[spec["material"]].restitution
+        if kind == "segment":
+            geometry.add_segments([spec["a"]], [spec["b"]], restitution)
+        elif kind == "polyline":
+            geometry.add_polyline(spec["points"], restitution)
+        elif kind == "polygon":
+            geometry.add_polygon(spec["points"], restitution)
+        elif kind == "heightmap":
+            # 等间距高度采样生成地形折线
+            heights = np.asarray(spec["heights"], dtype=np.float64)
+            xs = np.linspace(spec["x0"], spec["x1"], len(heights))
+            geometry.add_polyline(np.c_[xs, heights], restitution)
+        else:
+            raise ValueError(f"未知的碰撞体类型: {kind}")
+    return geometry
+
+
+def _load_forces(specs):
+    fields = []
+    for spec in specs:
+        params = dict(spec)
+        kind = params.pop("type")
+        if kind == "springs":
+            springs = SpringSet()
+            pairs = np.asarray(params.pop("pairs"), dtype=np.int64).reshape(-1, 2)
+            springs.add(pairs[:, 0], pairs[:, 1], **params)
+            fields.append(springs)
+        elif kind in FORCE_TYPES:
+            fields.append(FORCE_TYPES[kind](**params))
+        else:
+            raise ValueError(f"未知的力场类型: {kind}")
+    return fields
+
+
+def _load_soft_bodies(world, specs, materials):
+    soft_bodies = SoftBodySet()
+    for spec in specs:
+        params = dict(spec)
+        kind = params.pop("type")
+        if "material" in params:
+            params["restitution"] = materials[params.pop("material")].restitution
+        if kind == "jelly":
+            soft_bodies.add_jelly(world, **params)
+        elif kind == "cloth":
+            soft_bodies.add_cloth(world, **params)
+        else:
+            raise ValueError(f"未知的软体类型: {kind}")
+    return soft_bodies
+
+
+def _load_emitters(world, spec, materials):
+    system = EmitterSystem(spec.get("capacity", DEFAULT_POOL_CAPACITY), seed=spec.get("seed"))
+    for params in spec.get("sources", []):
+        params = dict(params)
+        material = materials[params.pop("material", "default")]
+        radius = params.setdefault("radius", DEFAULT_PARTICLE_RADIUS)
+        params["mass"] = material.mass_of(radius, params.get("mass", 1.0))
+        params.setdefault("restitution", material.restitution)
+        system.add_emitter(params.pop("position"), params.pop("rate"), **params)
+    for rect in spec.get("despawn_zones", []):
+        system.add_despawn_zone(rect)
+    return system.attach(world)
+
+
+def load_scene(source):
+    """从场景文件（JSON 路径）或已解析的字典创建 World
+
+    场景结构：
+        world      宽度、重力、初始容量、存储精度（dtype: "float32" 为紧凑模式）
+        materials  名称 -> {restitution, density}
+        bodies     单个物体 {"x", "y", ...} 或批量生成 {"type": "grid"/"random", ...}
+        body_file  可选的 .npz 文件（pos、vel、radius、mass、restitution），直接整块拷入数组
+        colliders  segment / polyline / polygon / heightmap
+        forces     linear_drag / quadratic_drag / uniform_wind / turbulent_wind / attractor / springs
+        contacts   可选，物体之间的接触求解器参数（ContactSolver 的关键字参数，{} 表示默认值）
+        soft_bodies  jelly / cloth（SoftBodySet.add_jelly / add_cloth 的关键字参数）
+        emitters   可选，{"capacity", "seed", "sources": [Emitter 的参数 + material], "despawn_zones"}
+
+    所有物体数量先统计出来，一次性分配好数组再逐段填充。
+    """
+    base = "."
+    if isinstance(source, (str, os.PathLike)):
+        base = os.path.dirname(os.fspath(source))
+        with open(source, encoding="utf-8") as f:
+            source = json.load(f)
+
+    materials = {"default": DEFAULT_MATERIAL}
+    for name, spec in source.get("materials", {}).items():
+        materials[name] = Material(**spec)
+
+    body_file = None
+    if "body_file" in source:
+        # npz 中的数组按需读取，一次读出后关闭文件
+        with np.load(os.path.join(base, source["body_file"])) as data:
+            body_file = {name: data[name] for name in data.files}
+
+    specs = source.get("bodies", [])
+    total = sum(_spec_count(spec) for spec in specs)
+    if body_file is not None:
+        total += len(body_file["pos"])
+
+    settings = source.get("world", {})
+    world = World(capacity=max(total, settings.get("capacity", 1)),
+                  width=settings.get("width", WORLD_WIDTH),
+                  gravity=settings.get("gravity", GRAVITY),
+                  dtype=settings.get("dtype", "float64"))
+
+    if body_file is not None:
+        k = len(body_file["pos"])
+        index = world.allocate_bodies(k)
+        for name in ("pos", "vel", "radius", "restitution"):
+            if name in body_file:
+                getattr(world, name)[index] = body_file[name]
+        if "mass" in body_file:
+            world.set_mass(index, body_file["mass"])
+
+    for spec in specs:
+        spec = dict(spec)
+        kind = spec.pop("type", "body")
+        material = materials[spec.pop("material", "default")]
+        radius = spec.pop("radius", BALL_RADIUS)
+        if kind == "body":
+            world.add_body(spec["x"], spec["y"], spec.get("vx", 0.0), spec.get("vy", 0.0),
+                           radius, material.mass_of(radius, spec.get("mass", 1.0)),
+                           material.restitution)
+        elif kind == "grid":
+            spawn_grid(world, radius=radius, material=material, **spec)
+        elif kind == "random":
+            spawn_random(world, radius=radius, material=material, **spec)
+
+    if "colliders" in source:
+        world.static_geometry = _load_colliders(source["colliders"], materials)
+    world.force_fields.extend(_load_forces(source.get("forces", [])))
+    if "contacts" in source:
+        world.contact_solver = ContactSolver(**source["contacts"])
+    if "soft_bodies" in source:
+        world.soft_bodies = _load_soft_bodies(world, source["soft_bodies"], materials)
+    if "emitters" in source:
+        _load_emitters(world, source["emitters"], materials)
+    return world
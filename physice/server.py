@@ -0,0 +1,384 @@
+import asyncio
+import json
+import math
+import struct
+
+import numpy as np
+
+# 状态流默认参数
+DEFAULT_HOST = "127.0.0.1"  # 默认只监听本机，需要让内网其他机器访问时显式传 "0.0.0.0"
+DEFAULT_PORT = 8765
+DEFAULT_RATE = 20.0  # 每秒发布的帧数
+DEFAULT_QUANTUM = 0.01  # 位置量化精度，单位：米
+DEFAULT_THRESHOLD = 2  # 位置变化超过多少个量化单位才写入增量帧
+DEFAULT_KEYFRAME_INTERVAL = 100  # 每隔多少帧强制发送一次关键帧
+
+# 帧格式（小端）：4 字节长度前缀 + 帧头 + 数据
+#   帧头：magic、版本、帧类型、帧号、模拟时间、物体总数、条目数、量化精度
+#   关键帧：所有物体的量化位置 int32 (count, 2) + 半径 float32 (count)
+#   增量帧：半径更新数 uint32 (r) + 变化物体的编号 uint32 (k) + 量化位置 int32 (k, 2)
+#           + 半径变化（包括新增）的物体编号 uint32 (r) + 半径 float32 (r)
+#           客户端先把本地数组截断或补齐到物体总数，再应用位置和半径
+MAGIC = b"PHYS"
+VERSION = 2
+KEYFRAME = 0
+DELTA = 1
+_LENGTH = struct.Struct("<I")
+_HEADER = struct.Struct("<4sBBIdIId")
+_RADIUS_COUNT = struct.Struct("<I")
+
+
+def encode_keyframe(frame_id, sim_time, quantized, radius, quantum):
+    """编码关键帧"""
+    count = len(quantized)
+    header = _HEADER.pack(MAGIC, VERSION, KEYFRAME, frame_id, sim_time, count, count, quantum)
+    body = header + quantized.astype("<i4").tobytes() + radius.astype("<f4").tobytes()
+    return _LENGTH.pack(len(body)) + body
+
+
+def encode_delta(frame_id, sim_time, count, ids, quantized, radius_ids, radius, quantum):
+    """编码增量帧"""
+    header = _HEADER.pack(MAGIC, VERSION, DELTA, frame_id, sim_time, count, len(ids), quantum)
+    body = (header + _RADIUS_COUNT.pack(len(radius_ids)) + ids.astype("<u4").tobytes()
+            + quantized.astype("<i4").tobytes() + radius_ids.astype("<u4").tobytes()
+            + radius.astype("<f4").tobytes())
+    return _LENGTH.pack(len(body)) + body
+
+
+class _ClientSession:
+    """一个观察端连接：只保留最新一帧待发送，写不过来时把积压的帧合并成一个追赶增量帧"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = None  # 等待写出的帧（bytes），只保留一帧
+        self.pending_ids = None  # 待发送增量帧包含的 (位置编号, 半径编号)，关键帧为 None
+        self.needs_keyframe = True  # 新连接和定期重新同步的客户端需要关键帧
+        self.ready = asyncio.Event()
+        self.dropped = 0
+
+    def offer(self, delta, ids, radius_ids, merge, keyframe):
+        """发布一帧；上一帧还没写出时丢弃它，改发从上次写出的状态追赶到当前状态的增量帧
+
+        待发送的增量帧总是相对客户端上次写出的状态，和新一帧的编号合并、取当前已发布的值，
+        就得到追赶帧，大小只取决于这段时间内变化过的物体。
+        merge(ids, radius_ids) 返回 (帧, 位置编号, 半径编号)，合并后不比关键帧小时返回关键帧和 None。
+        """
+        if self.needs_keyframe:
+            self.pending, self.pending_ids = keyframe(), None
+        elif self.pending is None:
+            self.pending, self.pending_ids = delta, (ids, radius_ids)
+        else:
+            self.dropped += 1
+            if self.pending_ids is None:
+                # 待发送的关键帧换成最新的关键帧，客户端仍然只收到一个关键帧
+                self.pending = keyframe()
+            else:
+                self.pending, *ids = merge(np.union1d(self.pending_ids[0], ids),
+                                           np.union1d(self.pending_ids[1], radius_ids))
+                self.pending_ids = None if ids[0] is None else tuple(ids)
+        self.needs_keyframe = False
+        self.ready.set()
+
+    async def write_loop(self):
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            frame, self.pending = self.pending, None
+            if frame is None:
+                continue
+            self.writer.write(frame)
+            await self.writer.drain()
+
+
+class SimulationServer:
+    """基于 asyncio 的状态流服务器
+
+    按固定步长推进 World，并按 rate 向所有连接的观察端发布状态：
+    增量帧只包含相对上次发布移动超过阈值的物体，位置按 quantum 量化为整数。
+    增量是相对所有客户端共享的“已发布状态”计算的，每帧只编码一次，
+    观察端数量增加时开销只是多写几次同一个 bytes 对象。
+    物体被移除（World.remove_bodies 用末尾物体填补空位）后，编号上换了物体的位置和半径
+    都与已发布状态不同，随下一个增量帧发出，不需要关键帧。
+    客户端写不过来时不积压帧：还没写出的帧被丢弃，和新一帧合并成一个相对该客户端上次写出状态的
+    追赶增量帧（见 _ClientSession.offer），只有新连接、每 keyframe_interval 帧的定期同步，
+    以及追赶帧不比关键帧小时才发关键帧。
+
+    客户端可以发送以换行分隔的 JSON 命令，对应窗口程序中的交互：
+        {"cmd": "spawn", "x": 10, "y": 50, "vx": 5, "vy": 0, "radius": 2}
+        {"cmd": "drag", "id": 3, "x": 10, "y": 50}
+        {"cmd": "release", "id": 3, "vx": 12, "vy": 4}
+        {"cmd": "reset"}
+        {"cmd": "pause"}
+    """
+
+    def __init__(self, world_factory, host=DEFAULT_HOST, port=DEFAULT_PORT, time_step=1 / 60,
+                 rate=DEFAULT_RATE, quantum=DEFAULT_QUANTUM, threshold=DEFAULT_THRESHOLD,
+                 keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        self.world_factory = world_factory
+        self.world = None
+        self.host = host
+        self.port = port
+        self.time_step = time_step
+        self.rate = rate
+        self.quantum = quantum
+        self.threshold = threshold
+        self.keyframe_interval = keyframe_interval
+        self.paused = False
+        self.clients = set()
+        self.commands = []
+        self.frame_id = 0
+        self._baseline = np.zeros((0, 2), dtype=np.int32)  # 已发布给客户端的量化位置
+        self._radius = np.zeros(0, dtype=np.float32)  # 已发布给客户端的半径
+        self._dragged = {}  # 被拖动物体编号 -> 原来的质量
+        self._server = None
+        self._handlers = set()
+        self._load_world()
+
+    def _load_world(self):
+        """创建新世界并清空已发布状态，下一帧把所有物体当作新物体发出"""
+        self.world = self.world_factory()
+        self.world.body_listeners.append(self)
+        self._dragged.clear()
+        self._baseline = np.zeros((0, 2), dtype=np.int32)
+        self._radius = np.zeros(0, dtype=np.float32)
+
+    def remap_bodies(self, remap):
+        """物体被移除或移动后更新被拖动物体的编号（见 World.remove_bodies）"""
+        if not self._dragged:
+            return
+        rows = np.fromiter(self._dragged, dtype=np.int64, count=len(self._dragged))
+        self._dragged = {int(new): mass for new, mass in zip(remap(rows), self._dragged.values()) if new >= 0}
+
+    async def start(self):
+        """开始监听端口，返回实际监听的端口（port=0 时由系统分配）"""
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve(self, duration=None):
+        """运行模拟和发布循环，duration 为 None 时一直运行"""
+        if self._server is None:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        next_step = start
+        next_publish = start
+        try:
+            while duration is None or loop.time() - start < duration:
+                self._apply_commands()
+                if not self.paused:
+                    # 积分在线程里执行，numpy 运算期间事件循环仍能处理网络 IO
+                    await asyncio.to_thread(self.world.step, self.time_step)
+                now = loop.time()
+                if now >= next_publish:
+                    self.publish()
+                    next_publish = max(next_publish + 1.0 / self.rate, now)
+                next_step = max(next_step + self.time_step, now)
+                await asyncio.sleep(next_step - loop.time())
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for client in list(self.clients):
+            client.writer.close()
+        # 等连接处理协程读到 EOF 自行退出，避免事件循环关闭时取消它们
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    def _quantize(self):
+        n = self.world.count
+        return np.rint(self.world.pos[:n] / self.quantum).astype(np.int32)
+
+    def publish(self):
+        """计算一帧增量（所有客户端共享），并发给每个客户端"""
+        quantized = self._quantize()
+        n = len(quantized)
+        radius = self.world.radius[:n].astype(np.float32)
+        previous = min(len(self._baseline), n)
+        self.frame_id += 1
+        sim_time = self.world.time_elapsed
+
+        # 物体变少时截断已发布状态（客户端按物体总数同样截断），变多时新物体整体发出
+        change = np.abs(quantized[:previous] - self._baseline[:previous]).max(axis=1, initial=0)
+        moved = change >= self.threshold
+        resized = np.flatnonzero(radius[:previous] != self._radius[:previous])
+        added = np.arange(previous, n)
+        ids = np.concatenate([np.flatnonzero(moved), added])
+        radius_ids = np.concatenate([resized, added])
+        if len(self._baseline) != n:
+            self._baseline = np.concatenate([self._baseline[:previous], quantized[previous:]])
+        self._baseline[ids] = quantized[ids]
+        self._radius = radius
+
+        if self.frame_id % self.keyframe_interval == 0:
+            for client in self.clients:
+                client.needs_keyframe = True
+        if not self.clients:
+            return
+
+        delta = encode_delta(self.frame_id, sim_time, n, ids, self._baseline[ids],
+                             radius_ids, radius[radius_ids], self.quantum)
+        cache = []
+
+        def keyframe():
+            if not cache:
+                cache.append(encode_keyframe(self.frame_id, sim_time, self._baseline,
+                                             radius, self.quantum))
+            return cache[0]
+
+        def merge(merged, merged_radius):
+            # 物体变少后旧帧里的编号可能已经超出物体总数
+            merged = merged[merged < n]
+            merged_radius = merged_radius[merged_radius < n]
+            if len(merged) * 12 + len(merged_radius) * 8 >= n * 12:
+                return keyframe(), None, None
+            frame = encode_delta(self.frame_id, sim_time, n, merged, self._baseline[merged],
+                                 merged_radius, radius[merged_radius], self.quantum)
+            return frame, merged, merged_radius
+
+        for client in self.clients:
+            client.offer(delta, ids, radius_ids, merge, keyframe)
+
+    async def _handle_client(self, reader, writer):
+        client = _ClientSession(reader, writer)
+        self.clients.add(client)
+        self._handlers.add(asyncio.current_task())
+        sender = asyncio.create_task(client.write_loop())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    self.commands.append(json.loads(line))
+                except ValueError:
+                    continue
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients.discard(client)
+            self._handlers.discard(asyncio.current_task())
+            sender.cancel()
+            writer.close()
+
+    def _apply_commands(self):
+        """在两次积分之间执行客户端命令，避免与积分线程同时修改数组
+
+        格式不对的命令（不是对象、缺少参数、类型或取值不对）直接跳过，不影响其他命令和其他客户端。
+        """
+        commands, self.commands = self.commands, []
+        for command in commands:
+            try:
+                self._apply_command(command)
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    def _apply_command(self, command):
+        if not isinstance(command, dict):
+            raise TypeError("命令必须是 JSON 对象")
+        world = self.world
+        kind = command.get("cmd")
+        index = None
+        if kind in ("drag", "release"):
+            index = command["id"]
+            if isinstance(index, bool) or not isinstance(index, int):
+                raise TypeError("物体编号必须是整数")
+            if not 0 <= index < world.count:
+                return
+        if kind == "spawn":
+            kwargs = {k: _number(command, k) for k in ("vx", "vy", "radius", "mass", "restitution")
+                      if k in command}
+            if kwargs.get("radius", 1.0) <= 0.0 or kwargs.get("mass", 1.0) <= 0.0:
+                raise ValueError("半径和质量必须为正")
+            world.add_body(_number(command, "x"), _number(command, "y"), **kwargs)
+        elif kind == "drag":
+            position = (_number(command, "x"), _number(command, "y"))
+            # 拖动时质量视为无穷大，不再受力
+            if index not in self._dragged:
+                self._dragged[index] = world.body_mass(index)
+                world.set_mass(index, float("inf"))
+            world.pos[index] = position
+            world.vel[index] = 0.0
+        elif kind == "release":
+            velocity = (_number(command, "vx", 0.0), _number(command, "vy", 0.0))
+            # 没有拖动过的物体直接设置速度，质量不变
+            world.release_body(index, velocity, self._dragged.pop(index, world.body_mass(index)))
+        elif kind == "reset":
+            self._load_world()
+        elif kind == "pause":
+            self.paused = not self.paused
+
+
+def _number(command, key, default=None):
+    """命令中的数值参数：缺少必需参数抛出 KeyError，不是有限数值抛出 TypeError / ValueError"""
+    value = command[key] if default is None else command.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(f"{key} 必须是数值")
+    if not math.isfinite(value):
+        raise ValueError(f"{key} 必须是有限值")
+    return float(value)
+
+
+class StateClient:
+    """状态流客户端：接收关键帧/增量帧并维护一份本地的物体位置，也可以发送命令"""
+
+    def __init__(self):
+        self.pos = np.zeros((0, 2))
+        self.radius = np.zeros(0, dtype=np.float32)
+        self.frame_id = 0
+        self.time_elapsed = 0.0
+        self.synced = False
+        self.bytes_received = 0
+
+    async def connect(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    async def send(self, **command):
+        self.writer.write(json.dumps(command).encode("utf-8") + b"\n")
+        await self.writer.drain()
+
+    async def receive(self):
+        """读取并应用一帧，返回帧类型 KEYFRAME 或 DELTA"""
+        (length,) = _LENGTH.unpack(await self.reader.readexactly(_LENGTH.size))
+        data = await self.reader.readexactly(length)
+        self.bytes_received += _LENGTH.size + length
+        magic, version, kind, frame_id, sim_time, count, entries, quantum = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("不是 PhysicE 状态流")
+        offset = _HEADER.size
+        if kind == KEYFRAME:
+            quantized = np.frombuffer(data, "<i4", count * 2, offset).reshape(-1, 2)
+            offset += count * 8
+            self.radius = np.frombuffer(data, "<f4", count, offset).copy()
+            self.pos = quantized * quantum
+            self.synced = True
+        else:
+            (resized,) = _RADIUS_COUNT.unpack_from(data, offset)
+            offset += _RADIUS_COUNT.size
+            ids = np.frombuffer(data, "<u4", entries, offset)
+            offset += entries * 4
+            quantized = np.frombuffer(data, "<i4", entries * 2, offset).reshape(-1, 2)
+            offset += entries * 8
+            radius_ids = np.frombuffer(data, "<u4", resized, offset)
+            offset += resized * 4
+            radius = np.frombuffer(data, "<f4", resized, offset)
+            if self.synced:
+                if count < len(self.pos):
+                    self.pos = self.pos[:count]
+                    self.radius = self.radius[:count]
+                elif count > len(self.pos):
+                    self.pos = np.concatenate([self.pos, np.zeros((count - len(self.pos), 2))])
+                    self.radius = np.concatenate([self.radius, np.zeros(count - len(self.radius), np.float32)])
+                self.pos[ids] = quantized * quantum
+                self.radius[radius_ids] = radius
+        self.frame_id = frame_id
+        self.time_elapsed = sim_time
+        return kind
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
@@ -0,0 +1,281 @@
+import numpy as np
+
+from physice.spatial import BodyGrid
+
+# 软体默认参数
+DEFAULT_STIFFNESS = 2000.0  # 弹簧刚度，单位：N/m
+DEFAULT_DAMPING = 2.0  # 沿弹簧方向的阻尼，单位：N·s/m
+DEFAULT_ITERATIONS = 30  # 每步共轭梯度迭代次数上限
+DEFAULT_TOLERANCE = 1e-4  # 残差相对于右端项的收敛阈值
+PARTICLE_RADIUS_RATIO = 0.4  # 质点碰撞半径与相邻质点间距之比，静止时相邻质点不重叠
+
+
+class SoftBodySet:
+    """由质点和弹簧网络组成的软体（果冻球、布料）
+
+    质点就是 World 里的普通物体，照常受力场作用、与地面和墙碰撞；
+    弹簧以边索引数组 (i, j) 存放，挂到 world.soft_bodies 上后每步在速度积分之后
+    用线性化的隐式欧拉求解弹簧冲量：
+
+        (M / h + Σ B_e) Δv = Σ f_e + h·K·v
+
+    B_e 是每根弹簧沿方向的刚度和阻尼 (c + h·k)·d·dᵀ，拉伸时再加上垂直方向的几何刚度，
+    矩阵始终对称正定，用 Jacobi 预条件的共轭梯度法求解；矩阵从不显式构造，
+    每次迭代只对边数组做一次 gather 和 bincount 散射。
+    刚度再大也不会发散，1/60 秒步长下不需要子步，刚度越大只是共轭梯度需要的迭代越多，
+    达到 iterations 次仍未收敛时弹簧表现得偏软一些。
+
+    地面和墙在同一次求解中作为速度约束处理，着地的质点不会被逐个推回地面而挤成一团。
+    隐式欧拉会衰减高频振动，刚度大的果冻落地后几乎不反弹，需要弹性时减小刚度。
+    质量为无穷大（inv_mass 为 0）的质点视为固定点，例如布料的挂点；
+    细节层次步进时本次不更新的质点同样按固定点处理。
+    接触求解器不知道弹簧的存在，比质点重得多的物体撞上软体时会把网格撞穿。
+    """
+
+    def __init__(self, iterations=DEFAULT_ITERATIONS, tolerance=DEFAULT_TOLERANCE):
+        self.iterations = iterations
+        self.tolerance = tolerance
+        self.clear()
+
+    def clear(self):
+        """移除所有软体和弹簧（质点仍留在 World 中）"""
+        self.i = np.zeros(0, dtype=np.int64)
+        self.j = np.zeros(0, dtype=np.int64)
+        self.rest_length = np.zeros(0)
+        self.stiffness = np.zeros(0)
+        self.damping = np.zeros(0)
+        self.bodies = []  # (类型, 质点索引切片)，用于绘制和统计
+        self.solver_iterations = 0  # 上一步共轭梯度实际迭代次数
+        self._nodes = None
+
+    def __len__(self):
+        return len(self.i)
+
+    def add_springs(self, i, j, rest_length, stiffness=DEFAULT_STIFFNESS, damping=DEFAULT_DAMPING):
+        """添加一根或一批弹簧，参数可以是标量或等长数组"""
+        i, j, rest_length, stiffness, damping = np.broadcast_arrays(
+            np.atleast_1d(i), np.atleast_1d(j), np.atleast_1d(rest_length),
+            np.atleast_1d(stiffness), np.atleast_1d(damping))
+        self.i = np.concatenate([self.i, i.astype(np.int64)])
+        self.j = np.concatenate([self.j, j.astype(np.int64)])
+        self.rest_length = np.concatenate([self.rest_length, rest_length.astype(np.float64)])
+        self.stiffness = np.concatenate([self.stiffness, stiffness.astype(np.float64)])
+        self.damping = np.concatenate([self.damping, damping.astype(np.float64)])
+        self._nodes = None
+
+    def connect(self, world, i, j, stiffness=DEFAULT_STIFFNESS, damping=DEFAULT_DAMPING):
+        """按物体当前距离作为静止长度连接弹簧"""
+        i = np.atleast_1d(i)
+        j = np.atleast_1d(j)
+        d = world.pos[j] - world.pos[i]
+        self.add_springs(i, j, np.hypot(d[:, 0], d[:, 1]), stiffness, damping)
+
+    def add_jelly(self, world, center, radius, spacing=1.0, stiffness=DEFAULT_STIFFNESS,
+                  damping=DEFAULT_DAMPING, mass=1.0, restitution=0.0, velocity=(0.0, 0.0)):
+        """在圆内按三角形网格生成质点，连接相邻和次相邻质点，返回质点索引切片
+
+        mass 为整个果冻球的质量，平均分给每个质点。次相邻的弹簧（距离两倍间距以内）
+        抵抗整体的剪切和弯曲，没有它们三角形网格会像铰链一样塌下去。
+        """
+        rows = int(radius / (spacing * 0.866)) + 1
+        cols = int(radius / spacing) + 1
+        row, col = np.mgrid[-rows:rows + 1, -cols - 1:cols + 2]
+        x = (col + 0.5 * (row & 1)) * spacing
+        y = row * spacing * np.sqrt(0.75)
+        inside = x * x + y * y <= radius * radius
+        points = np.c_[x[inside], y[inside]] + center
+        index = self._add_particles(world, points, spacing, mass, restitution, velocity)
+        self._connect_within(world, index, 2.01 * spacing, stiffness, damping)
+        self.bodies.append(("jelly", index))
+        return index
+
+    def add_cloth(self, world, origin, rows, cols, spacing=1.0, stiffness=DEFAULT_STIFFNESS,
+                  bend_stiffness=None, damping=DEFAULT_DAMPING, mass=1.0, restitution=0.0,
+                  pinned=((0, 0), (0, -1))):
+        """生成 rows x cols 的布料，origin 为左上角，返回质点索引切片
+
+        结构弹簧连接上下左右，剪切弹簧连接对角，弯曲弹簧隔一个质点连接（刚度 bend_stiffness，
+        默认为 stiffness 的十分之一）。pinned 中的 (行, 列) 质点质量设为无穷大，固定在原处。
+        """
+        r, c = np.mgrid[0:rows, 0:cols]
+        points = np.c_[origin[0] + c.ravel() * spacing, origin[1] - r.ravel() * spacing]
+        index = self._add_particles(world, points, spacing, mass, restitution, (0.0, 0.0))
+        ids = np.arange(index.start, index.stop).reshape(rows, cols)
+        structural = [(ids[:, :-1], ids[:, 1:]), (ids[:-1, :], ids[1:, :]),
+                      (ids[:-1, :-1], ids[1:, 1:]), (ids[:-1, 1:], ids[1:, :-1])]
+        bend = [(ids[:, :-2], ids[:, 2:]), (ids[:-2, :], ids[2:, :])]
+        for pairs, k in ((structural, stiffness),
+                         (bend, stiffness * 0.1 if bend_stiffness is None else bend_stiffness)):
+            i = np.concatenate([a.ravel() for a, _ in pairs])
+            j = np.concatenate([b.ravel() for _, b in pairs])
+            self.connect(world, i, j, k, damping)
+        for row, col in pinned:
+            world.set_mass(ids[row, col], float("inf"))
+        self.bodies.append(("cloth", index))
+        return index
+
+    @staticmethod
+    def _add_particles(world, points, spacing, mass, restitution, velocity):
+        index = world.add_bodies(points, radius=PARTICLE_RADIUS_RATIO * spacing,
+                                 mass=mass / len(points), restitution=restitution)
+        world.vel[index] = velocity
+        return index
+
+    def _connect_within(self, world, index, distance, stiffness, damping):
+        """连接 index 内距离小于 distance 的所有质点对"""
+        # 单元边长取 distance，距离小于 distance 的质点对一定在同一单元或相邻单元
+        pos = world.pos[index]
+        grid = BodyGrid(cell_size=distance)
+        grid.build(pos, world.radius[index])
+        i, j = grid.pairs()
+        d = pos[j] - pos[i]
+        close = np.hypot(d[:, 0], d[:, 1]) < distance
+        self.connect(world, i[close] + index.start, j[close] + index.start, stiffness, damping)
+
+    def _topology(self):
+        """弹簧涉及的质点（排序去重）和边在其中的局部编号，弹簧变化时重建"""
+        if self._nodes is None:
+            self._nodes, local = np.unique(np.concatenate([self.i, self.j]), return_inverse=True)
+            self._local_i = local[:len(self.i)]
+            self._local_j = local[len(self.i):]
+        return self._nodes, self._local_i, self._local_j
+
+    def remap_bodies(self, remap):
+        """质点被移除或移动后更新弹簧两端的编号（见 World.remove_bodies）"""
+        if not len(self.i):
+            return
+        i = remap(self.i)
+        j = remap(self.j)
+        keep = (i >= 0) & (j >= 0)
+        self.i = i[keep]
+        self.j = j[keep]
+        self.rest_length = self.rest_length[keep]
+        self.stiffness = self.stiffness[keep]
+        self.damping = self.damping[keep]
+        self._nodes = None
+
+    def particles(self):
+        """所有连有弹簧的质点编号（排序去重）"""
+        return self._topology()[0]
+
+    def solve(self, world, index, vel, dt):
+        """求解弹簧冲量并加到 vel（index 对应物体已积分外力的速度）上
+
+        dt 是标量，或细节层次补步时每个物体各自的步长 (k, 1)。
+        """
+        if not len(self.i):
+            return
+        nodes, i, j = self._topology()
+        m = len(nodes)
+        # 质点在 index 中的位置，不在 index 中的质点本次不更新
+        if isinstance(index, slice):
+            slot = nodes - index.start
+            active = (nodes >= index.start) & (nodes < index.stop)
+        else:
+            lookup = np.full(world.count, -1)
+            lookup[index] = np.arange(len(index))
+            slot = lookup[nodes]
+            active = slot >= 0
+        # 已经推进到目标时刻的质点（细节层次补步时步长为 0）也不更新
+        h = np.zeros(m)
+        h[active] = np.broadcast_to(np.asarray(dt, dtype=np.float64).reshape(-1), len(vel))[slot[active]]
+        active &= (world.inv_mass[nodes] > 0.0) & (h > 0.0)
+        slot = slot[active]
+        if not len(slot):
+            return
+
+        # 速度用复数表示 (vx + i·vy)，二维向量运算都变成一维数组运算
+        v = world.vel[nodes].astype(np.float64) @ (1.0, 1j)
+        v[active] = vel[slot].astype(np.float64) @ (1.0, 1j)
+        h_edge = np.maximum(h[i], h[j])
+
+        p = world.pos[nodes].astype(np.float64) @ (1.0, 1j)
+        d = p[j] - p[i]
+        length = np.abs(d)
+        np.maximum(length, 1e-9, out=length)
+        d /= length
+        k = self.stiffness
+        # 沿弹簧方向的刚度 + 阻尼，以及拉伸时垂直方向的几何刚度（压缩时取 0 保持正定）
+        w = self.damping + h_edge * k
+        g = h_edge * k * np.maximum(1.0 - self.rest_length / length, 0.0)
+
+        def edge_response(u):
+            """每根弹簧对两端相对速度 u = v_j - v_i 的响应 B_e·u"""
+            along = (d.conj() * u).real
+            return w * along * d + g * (u - along * d)
+
+        def scatter(f):
+            """边上的量作用到两端：i 端 +f，j 端 -f"""
+            real = np.bincount(i, f.real, m) - np.bincount(j, f.real, m)
+            imag = np.bincount(i, f.imag, m) - np.bincount(j, f.imag, m)
+            return real + 1j * imag
+
+        # 地面和墙作为速度约束：本步会穿过边界的质点，对应分量的速度直接定为恰好落到边界上，
+        # 共轭梯度只在其余分量上求解（约束过滤），弹簧在同一次求解中感受到支撑力
+        radius = world.radius[nodes].astype(np.float64)
+        h_safe = np.where(active, h, 1.0)
+        fixed_x = np.zeros(m, dtype=bool)
+        target_x = np.zeros(m)
+        for wall, hit in ((radius, p.real + h * v.real < radius),
+                          (world.width - radius, p.real + h * v.real > world.width - radius)):
+            hit &= active
+            fixed_x |= hit
+            target_x = np.where(hit, (wall - p.real) / h_safe, target_x)
+        fixed_y = active & (p.imag + h * v.imag < radius)
+        target_y = (radius - p.imag) / h_safe
+        x = np.where(fixed_x, target_x - v.real, 0.0) + 1j * np.where(fixed_y, target_y - v.imag, 0.0)
+        free_x = (active & ~fixed_x).astype(np.float64)
+        free_y = (active & ~fixed_y).astype(np.float64)
+
+        def project(z):
+            return z.real * free_x + 1j * (z.imag * free_y)
+
+        mass = world.mass[nodes].astype(np.float64)
+        diagonal = np.where(active, mass / h_safe, 1.0)
+
+        def apply(z):
+            return diagonal * z - scatter(edge_response(z[j] - z[i]))
+
+        # 右端项：当前弹簧力 + h·K·v，边方向上合并成 k·伸长 + w·相对速度
+        u = v[j] - v[i]
+        b = scatter(k * (length - self.rest_length) * d + edge_response(u))
+
+        # Jacobi 预条件：对角块按 x、y 分量分别取倒数
+        dx2 = d.real * d.real
+        dy2 = d.imag * d.imag
+        block_x = w * dx2 + g * dy2
+        block_y = w * dy2 + g * dx2
+        pre_x = free_x / (diagonal + np.bincount(i, block_x, m) + np.bincount(j, block_x, m))
+        pre_y = free_y / (diagonal + np.bincount(i, block_y, m) + np.bincount(j, block_y, m))
+
+        # 预条件共轭梯度，从约束分量的取值出发，固定点和约束分量始终不变
+        r = project(b - apply(x))
+        z = pre_x * r.real + 1j * (pre_y * r.imag)
+        direction = z.copy()
+        rz = np.vdot(r, z).real
+        b = project(b)
+        limit = (self.tolerance * self.tolerance) * np.vdot(b, b).real
+        iterations = 0
+        while iterations < self.iterations and np.vdot(r, r).real > limit:
+            q = project(apply(direction))
+            alpha = rz / np.vdot(direction, q).real
+            x += alpha * direction
+            r -= alpha * q
+            z = pre_x * r.real + 1j * (pre_y * r.imag)
+            rz_next = np.vdot(r, z).real
+            direction = z + (rz_next / rz) * direction
+            rz = rz_next
+            iterations += 1
+        self.solver_iterations = iterations
+
+        dv = x[active]
+        vel[slot, 0] += dv.real
+        vel[slot, 1] += dv.imag
+
+    def potential_energy(self, world, n):
+        """弹簧的弹性势能"""
+        if not len(self.i):
+            return 0.0
+        d = world.pos[self.j] - world.pos[self.i]
+        stretch = np.hypot(d[:, 0], d[:, 1]) - self.rest_length
+        return 0.5 * np.dot(self.stiffness, stretch * stretch)
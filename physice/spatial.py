@@ -0,0 +1,96 @@
+import numpy as np
+
+# 物体网格默认参数
+MAX_GRID_CELLS = 1 << 22  # 网格单元数上限，超过时自动放大单元
+
+# 查找物体对时检查的相邻单元：本单元和一半邻居，每对相邻单元只检查一次
+_HALF_NEIGHBORS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+class BodyGrid:
+    """动态物体的均匀网格索引
+
+    每次 build 时按物体中心所在单元做一次排序，单元内容用 CSR 格式
+    （cell_start + cell_items）存储，和 StaticGeometry 的静态网格是同一种布局。
+    网格只覆盖当前物体的包围盒，所以世界再大也只和物体分布有关。
+    """
+
+    def __init__(self, cell_size=None):
+        self.cell_size = cell_size  # 网格单元边长，None 表示取物体平均半径的 4 倍
+        self.count = 0
+
+    def build(self, pos, radius):
+        """用前 len(pos) 个物体的位置和半径重建索引"""
+        self.count = len(pos)
+        if not self.count:
+            return
+        cell = self.cell_size
+        if cell is None:
+            cell = max(4.0 * float(radius.mean()), 1e-3)
+        # 按列分别求最值，比 (n, 2) 数组上的 axis=0 归约快
+        self.origin = np.array([pos[:, 0].min(), pos[:, 1].min()])
+        extent = np.array([pos[:, 0].max(), pos[:, 1].max()]) - self.origin
+        while np.prod(np.floor(extent / cell) + 1) > MAX_GRID_CELLS:
+            cell *= 2.0
+        self._cell = cell
+        self.shape = (np.floor(extent / cell) + 1).astype(np.int64)
+        # 最大半径用于查询时外扩，保证部分落在矩形内的物体也能被找到
+        self.max_radius = float(radius.max())
+
+        # 坐标都不小于 origin，乘以倒数后截断即为向下取整，比浮点 // 快得多
+        c = ((pos - self.origin) * (1.0 / cell)).astype(np.int64)
+        np.minimum(c, self.shape - 1, out=c)
+        self.body_cell = c[:, 0] * self.shape[1] + c[:, 1]
+        self.cell_items = np.argsort(self.body_cell)
+        counts = np.bincount(self.body_cell, minlength=int(self.shape[0] * self.shape[1]))
+        self.cell_start = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.cell_start[1:])
+
+    def query(self, lo, hi):
+        """返回中心可能与矩形 [lo, hi] 外扩 max_radius 后相交的物体索引（未做精确过滤）"""
+        if not self.count:
+            return np.zeros(0, dtype=np.int64)
+        lo = np.asarray(lo, dtype=np.float64) - self.max_radius
+        hi = np.asarray(hi, dtype=np.float64) + self.max_radius
+        c0 = np.floor((lo - self.origin) / self._cell).astype(np.int64)
+        c1 = np.floor((hi - self.origin) / self._cell).astype(np.int64)
+        if (c1 < 0).any() or (c0 >= self.shape).any():
+            return np.zeros(0, dtype=np.int64)
+        c0 = np.clip(c0, 0, self.shape - 1)
+        c1 = np.clip(c1, 0, self.shape - 1)
+        # 同一列中相邻的 y 单元在 CSR 中是连续的，每列只需要切一段
+        rows = np.arange(c0[0], c1[0] + 1) * self.shape[1]
+        start = self.cell_start[rows + c0[1]]
+        end = self.cell_start[rows + c1[1] + 1]
+        count = end - start
+        offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        return self.cell_items[np.repeat(start, count) + offset]
+
+    def pairs(self):
+        """返回中心位于同一单元或相邻单元的物体对 (i, j)，每对只出现一次
+
+        单元边长不小于两物体半径之和时，所有相互重叠的物体对都包含在结果中。
+        """
+        if not self.count:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        cx, cy = np.divmod(self.body_cell, self.shape[1])
+        first = []
+        second = []
+        for dx, dy in _HALF_NEIGHBORS:
+            nx = cx + dx
+            ny = cy + dy
+            body = np.flatnonzero((nx < self.shape[0]) & (ny >= 0) & (ny < self.shape[1]))
+            cell = nx[body] * self.shape[1] + ny[body]
+            start = self.cell_start[cell]
+            count = self.cell_start[cell + 1] - start
+            offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+            i = np.repeat(body, count)
+            j = self.cell_items[np.repeat(start, count) + offset]
+            if dx == 0 and dy == 0:
+                keep = i < j
+                i = i[keep]
+                j = j[keep]
+            first.append(i)
+            second.append(j)
+        return np.concatenate(first), np.concatenate(second)
@@ -0,0 +1,109 @@
+import math
+
+# 抛出速度估计默认参数
+DEFAULT_CAPACITY = 16  # 环形缓冲区容量（采样点个数）
+DEFAULT_WINDOW_MS = 100.0  # 拟合使用的时间窗口，单位：毫秒
+DEFAULT_HALF_LIFE_MS = 40.0  # 指数加权的半衰期，越小越偏向最近的采样点
+
+
+class ThrowVelocityEstimator:
+    """基于固定大小环形缓冲区的鼠标抛出速度估计器
+
+    每次鼠标事件只写入一个预分配的槽位，不会像 list.pop(0) 那样搬移元素。
+    松开鼠标时，对时间窗口内的采样点做指数加权的最小二乘直线拟合，
+    斜率即为抛出速度（像素/毫秒）。缓冲区大小固定，所以每次估计也是常数时间。
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, window_ms=DEFAULT_WINDOW_MS,
+                 half_life_ms=DEFAULT_HALF_LIFE_MS):
+        if capacity < 2:
+            raise ValueError("capacity 至少为 2")
+        self.capacity = capacity
+        self.window_ms = window_ms
+        self.half_life_ms = half_life_ms
+        # 预分配的环形缓冲区，三个等长的列表分别存放 x、y、时间戳
+        self._xs = [0.0] * capacity
+        self._ys = [0.0] * capacity
+        self._ts = [0.0] * capacity
+        self._head = 0  # 下一个写入位置
+        self._size = 0  # 当前有效采样点个数
+
+    def __len__(self):
+        return self._size
+
+    def reset(self, x=None, y=None, t=None):
+        """清空缓冲区，可选地写入第一个采样点（拖动开始时调用）"""
+        self._head = 0
+        self._size = 0
+        if x is not None:
+            self.push(x, y, t)
+
+    def push(self, x, y, t):
+        """记录一个鼠标采样点，时间戳单位为毫秒
+
+        同一时间戳（或时间倒退）的事件视为被合并的事件：只用最新位置覆盖最后一个槽位，
+        避免零时间差的点破坏拟合。
+        """
+        if self._size:
+            last = (self._head - 1) % self.capacity
+            if t <= self._ts[last]:
+                self._xs[last] = x
+                self._ys[last] = y
+                return
+        self._xs[self._head] = x
+        self._ys[self._head] = y
+        self._ts[self._head] = t
+        self._head = (self._head + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def points(self):
+        """按时间从旧到新依次返回缓冲区内的 (x, y, t)，用于绘制拖动轨迹"""
+        start = self._head - self._size
+        for k in range(self._size):
+            i = (start + k) % self.capacity
+            yield self._xs[i], self._ys[i], self._ts[i]
+
+    def estimate(self, now=None):
+        """返回抛出速度 (vx, vy)，单位：像素/毫秒
+
+        只使用 [now - window_ms, now] 内的采样点。如果鼠标在松开前已经停住，
+        窗口内不足两个点，返回 (0.0, 0.0)，小球不会被“甩出”。
+        """
+        if self._size == 0:
+            return 0.0, 0.0
+        newest = (self._head - 1) % self.capacity
+        t_ref = self._ts[newest]
+        if now is None:
+            now = t_ref
+        decay = math.log(2.0) / self.half_life_ms
+
+        # 以最新采样点为时间原点，累加加权和
+        sw = st = stt = sx = sy = stx = sty = 0.0
+        count = 0
+        for k in range(self._size):
+            i = (newest - k) % self.capacity
+            age = now - self._ts[i]
+            if age > self.window_ms:
+                break
+            t = self._ts[i] - t_ref
+            w = math.exp(-decay * age)
+            x = self._xs[i]
+            y = self._ys[i]
+            sw += w
+            st += w * t
+            stt += w * t * t
+            sx += w * x
+            sy += w * y
+            stx += w * t * x
+            sty += w * t * y
+            count += 1
+
+        if count < 2:
+            return 0.0, 0.0
+        denom = sw * stt - st * st
+        if denom <= 1e-12:
+            return 0.0, 0.0
+        vx = (sw * stx - st * sx) / denom
+        vy = (sw * sty - st * sy) / denom
+        return vx, vy
@@ -0,0 +1,447 @@
+import numpy as np
+
+from physice.events import CONTACT, RELEASE, REST, WAKE, WALL
+from physice.forces import GRAVITY, Gravity
+from physice.spatial import BodyGrid
+
+# 物理常量定义
+REBOUND_COEFFICIENT = 0.5  # 默认反弹系数，值越小反弹高度越低
+MIN_REBOUND_VELOCITY = 0.5  # 最小反弹速度阈值，避免无限小反弹
+REST_VELOCITY = 0.2  # 速度低于该值并持续 REST_STEPS 步，认为物体已静止
+REST_STEPS = 30
+
+# 物体状态标志位，按位存放在 uint8 的 flags 数组中
+RESTING = 1 << 0  # 已静止（只在记录事件时更新）
+
+# 世界尺寸常量（单位：米），默认与 800x600 窗口、SCALE_FACTOR = 3 对应
+WORLD_WIDTH = 800 / 3
+BALL_RADIUS = 20 / 3
+
+
+class World:
+    """多物体世界，物体状态按“数组结构”(SoA) 存放在预分配的 numpy 数组中
+
+    坐标系以米为单位，x 向右、y 向上，地面在 y = 0，左右墙在 x = 0 和 x = width，
+    世界大小与窗口无关，由相机决定显示哪一部分。
+    前 count 个槽位是有效物体，所有步进计算都只针对 [:count] 做向量化运算。
+
+    dtype=np.float32 时位置、速度、力、半径、质量和反弹系数用单精度存放（紧凑模式），
+    每个物体的内存减半，步进时读写的数据量也减半；计数和标志位在两种模式下都是小整数。
+    精度对比见 docs/compact_mode.md。
+    """
+
+    def __init__(self, capacity=1024, width=WORLD_WIDTH, gravity=GRAVITY, dtype=np.float64):
+        self.width = width
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        self.capacity = 0
+        self.time_elapsed = 0.0
+        self.last_update = None
+        self._allocate(capacity)
+        # 力场列表，每步按顺序累加到 self.force
+        self.force_fields = [Gravity(gravity)]
+        # 静态碰撞几何（physice.colliders.StaticGeometry），None 表示只有地面和墙
+        self.static_geometry = None
+        # 接触求解器（physice.contacts.ContactSolver），None 表示物体之间不碰撞；
+        # 设置后地面、墙和静态几何的碰撞也由求解器处理
+        self.contact_solver = None
+        # 软体弹簧网络（physice.softbody.SoftBodySet），在速度积分之后隐式求解
+        self.soft_bodies = None
+        # 物体网格索引，在需要查询时按步数惰性重建
+        self.grid = BodyGrid()
+        self.tick = 0
+        self._grid_tick = -1
+        # 细节层次 (LOD) 步进状态
+        self.lod_view = None
+        self.lod_interval = 1
+        self._near = None
+        self._lod_tick = 0
+        self._lod_cursor = 0
+        self._partition_count = 0
+        # 事件流（physice.events.EventStream），None 表示不记录事件
+        self.events = None
+        self._event_time = 0.0
+        # 能量/动量诊断（physice.diagnostics.Diagnostics），None 表示不统计
+        self.diagnostics = None
+        # 发射器（physice.emitters.EmitterSystem），每步开始时生成和回收物体
+        self.emitters = None
+        # 其他保存了物体编号的对象（拖动状态、状态流服务器等），移除物体时同样回调 remap_bodies
+        self.body_listeners = []
+
+    def _allocate(self, capacity):
+        """分配（或扩容）物体数组，保留已有物体的数据"""
+        old = self.capacity
+        self.capacity = capacity
+
+        def grow(array, shape, fill=0.0, dtype=self.dtype):
+            new = np.full(shape, fill, dtype=dtype)
+            if array is not None:
+                new[:old] = array[:old]
+            return new
+
+        self.pos = grow(getattr(self, "pos", None), (capacity, 2))
+        self.vel = grow(getattr(self, "vel", None), (capacity, 2))
+        self.force = grow(getattr(self, "force", None), (capacity, 2))
+        self.radius = grow(getattr(self, "radius", None), capacity, BALL_RADIUS)
+        self.mass = grow(getattr(self, "mass", None), capacity, 1.0)
+        self.inv_mass = grow(getattr(self, "inv_mass", None), capacity, 1.0)
+        self.restitution = grow(getattr(self, "restitution", None), capacity, REBOUND_COEFFICIENT)
+        self.rebound_count = grow(getattr(self, "rebound_count", None), capacity, 0, np.uint32)
+        # 每个物体最后一次被步进到的时刻，细节层次步进时远处物体据此补上落后的时间。
+        # 只在开启细节层次时分配；时间会一直增长，始终用双精度保证步长准确
+        if getattr(self, "last_update", None) is not None:
+            self.last_update = grow(self.last_update, capacity, self.time_elapsed, np.float64)
+        # 静止检测：连续低速的步数（不超过 REST_STEPS）和状态标志位
+        self.still_steps = grow(getattr(self, "still_steps", None), capacity, 0, np.uint8)
+        self.flags = grow(getattr(self, "flags", None), capacity, 0, np.uint8)
+
+    def reserve(self, capacity):
+        """确保至少能容纳 capacity 个物体，按 2 倍扩容以摊薄复制成本"""
+        if capacity > self.capacity:
+            self._allocate(max(capacity, 2 * self.capacity))
+
+    def add_body(self, x, y, vx=0.0, vy=0.0, radius=BALL_RADIUS, mass=1.0,
+                 restitution=REBOUND_COEFFICIENT):
+        """添加一个物体，返回它的索引"""
+        return self.add_bodies([(x, y)], [(vx, vy)], radius, mass, restitution).start
+
+    def add_bodies(self, pos, vel=None, radius=BALL_RADIUS, mass=1.0,
+                   restitution=REBOUND_COEFFICIENT):
+        """批量添加物体，radius/mass/restitution 可以是标量或数组，返回新物体的索引切片"""
+        pos = np.asarray(pos, dtype=self.dtype).reshape(-1, 2)
+        index = self.allocate_bodies(len(pos), radius, mass, restitution)
+        self.pos[index] = pos
+        if vel is not None:
+            self.vel[index] = vel
+        return index
+
+    def allocate_bodies(self, k, radius=BALL_RADIUS, mass=1.0, restitution=REBOUND_COEFFICIENT):
+        """在数组末尾分配 k 个物体槽位（位置、速度为 0），返回索引切片
+
+        批量生成器可以直接往 pos[index]、vel[index] 里写数据，不需要先拼出中间数组。
+        """
+        start = self.count
+        end = start + k
+        self.reserve(end)
+        index = slice(start, end)
+        self.pos[index] = 0.0
+        self.vel[index] = 0.0
+        self.force[index] = 0.0
+        self.radius[index] = radius
+        self.set_mass(index, mass)
+        self.restitution[index] = restitution
+        self.rebound_count[index] = 0
+        if self.last_update is not None:
+            self.last_update[index] = self.time_elapsed
+        self.still_steps[index] = 0
+        self.flags[index] = 0
+        self.count = end
+        return index
+
+    def set_mass(self, index, mass):
+        """设置质量，mass 为 inf 时物体不受力（静止或被拖动）"""
+        mass = np.asarray(mass, dtype=np.float64)
+        self.mass[index] = np.where(np.isinf(mass), 1.0, mass)
+        self.inv_mass[index] = np.where(np.isinf(mass), 0.0, 1.0 / mass)
+
+    def body_mass(self, index):
+        """单个物体的质量，固定物体（质量倒数为 0）返回 inf，可以原样传回 set_mass"""
+        return float("inf") if self.inv_mass[index] == 0.0 else float(self.mass[index])
+
+    def release_body(self, index, velocity, mass):
+        """结束拖动：恢复拖动前的质量 mass（body_mass 的返回值），按 velocity 抛出并记录 RELEASE 事件
+
+        固定的物体（mass 为 inf，如布料的固定质点）松开后仍然固定，不带走拖动速度。
+        需要在与 step 相同的锁内调用。
+        """
+        self.set_mass(index, mass)
+        if mass == float("inf"):
+            velocity = (0.0, 0.0)
+        self.vel[index] = velocity
+        if self.events is not None:
+            vx, vy = velocity
+            x, y = self.pos[index]
+            self.events.emit(RELEASE, index, self.time_elapsed, (vx * vx + vy * vy) ** 0.5, x, y)
+
+    def clear(self):
+        """移除所有物体，保留已分配的数组"""
+        self.count = 0
+        self.time_elapsed = 0.0
+        self._near = None
+        if self.contact_solver is not None:
+            self.contact_solver.reset()
+        if self.soft_bodies is not None:
+            self.soft_bodies.clear()
+        if self.emitters is not None:
+            self.emitters.reset()
+
+    def remove_bodies(self, rows):
+        """移除一批物体，用末尾的物体填补空位，保持有效物体连续存放在 [:count]
+
+        空闲槽位始终是 [count:capacity) 这一段，生成物体直接从 count 往后取，
+        不需要单独的空闲链表，也不会重新分配数组。被移动的物体编号会改变，
+        接触缓存、弹簧、软体、发射器和 body_listeners 中保存了物体编号的对象
+        通过 remap_bodies(remap) 同步更新：
+        remap(ids) 返回新编号，被移除的物体返回 -1。
+        返回 (moved, holes)：被移动物体的原编号和新编号。
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        if not len(rows):
+            return rows, rows
+        n = self.count
+        end = n - len(rows)
+        holes = rows[rows < end]
+        tail = np.arange(end, n)
+        moved = tail[~np.isin(tail, rows, assume_unique=True)]
+        for array in self._body_arrays().values():
+            if array is not None:
+                array[holes] = array[moved]
+        self.count = end
+        self._grid_tick = -1
+
+        def remap(ids):
+            ids = np.asarray(ids, dtype=np.int64)
+            new = ids.copy()
+            new[np.isin(ids, rows)] = -1
+            at = np.minimum(np.searchsorted(moved, ids), max(len(moved) - 1, 0))
+            hit = (moved[at] == ids) if len(moved) else np.zeros(len(ids), bool)
+            new[hit] = holes[at[hit]]
+            return new
+
+        if self._near is not None:
+            # 只更新近处物体集合，不重新划分（重新划分会打断后台轮转）；
+            # 划分之后新加入的物体和被移到空位上的物体后台轮转可能刚好错过，一律按近处物体处理
+            near = remap(np.concatenate([self._near, np.arange(min(self._partition_count, n), n)]))
+            self._near = np.union1d(near[near >= 0], holes)
+            self._partition_count = end
+
+        for component in (self.contact_solver, self.soft_bodies, self.emitters, *self.force_fields,
+                          *self.body_listeners):
+            if component is not None:
+                component.remap_bodies(remap)
+        return moved, holes
+
+    def _body_arrays(self):
+        """所有随物体数量增长的数组（未分配的为 None）"""
+        return {name: getattr(self, name) for name in
+                ("pos", "vel", "force", "radius", "mass", "inv_mass", "restitution",
+                 "rebound_count", "last_update", "still_steps", "flags")}
+
+    def memory_report(self):
+        """物体数组的内存占用：{数组名: 字节数}，以及总字节数和每个物体的字节数
+
+        只统计随物体数量增长的数组（按已分配容量计算），不含网格索引等临时数据。
+        """
+        report = {name: array.nbytes for name, array in self._body_arrays().items() if array is not None}
+        total = sum(report.values())
+        report["total"] = total
+        report["bytes_per_body"] = total / max(self.capacity, 1)
+        return report
+
+    def bodies_in_rect(self, lo, hi):
+        """通过物体网格索引返回与矩形 [lo, hi] 相交的物体索引（用于视野裁剪）"""
+        n = self.count
+        if self._grid_tick != self.tick or self.grid.count != n:
+            self.grid.build(self.pos[:n], self.radius[:n])
+            self._grid_tick = self.tick
+        candidates = self.grid.query(lo, hi)
+        pos = self.pos[candidates]
+        r = self.radius[candidates][:, None]
+        inside = ((pos + r >= lo) & (pos - r <= hi)).all(axis=1)
+        return candidates[inside]
+
+    def set_view(self, lo, hi, interval=4, margin=0.0):
+        """开启细节层次 (LOD) 步进：矩形 [lo, hi] 外扩 margin 之外的物体每 interval 步才更新一次"""
+        if self.last_update is None:
+            self.last_update = np.full(self.capacity, self.time_elapsed)
+        self.lod_view = (np.asarray(lo, dtype=np.float64) - margin,
+                         np.asarray(hi, dtype=np.float64) + margin)
+        self.lod_interval = interval
+
+    def clear_view(self):
+        """关闭细节层次步进，并把远处物体补到当前时刻"""
+        if self._near is not None and self.count:
+            self._advance(slice(0, self.count), self.time_elapsed)
+        self.lod_view = None
+        self._near = None
+        self.last_update = None
+
+    def accumulate_forces(self, index):
+        """清零 index 对应物体的力并依次累加所有启用的力场"""
+        self.force[index] = 0.0
+        for field in self.force_fields:
+            if field.enabled:
+                field.apply(self, index)
+
+    def step(self, dt):
+        """推进一个时间步
+
+        未开启细节层次时所有物体一起步进；开启后视野附近的物体每步都更新，
+        其余物体按索引顺序每步更新约 count / lod_interval 个，每个物体用自己落后的时间一次补上，
+        后台更新的开销平摊到每一步，每个物体最多落后 lod_interval 步。
+        """
+        if self.emitters is not None:
+            self.emitters.update(self, dt)
+        n = self.count
+        if n:
+            if self.lod_view is None or self.lod_interval <= 1:
+                self._advance(slice(0, n), self.time_elapsed + dt, dt)
+            else:
+                self._step_lod(dt)
+        self.time_elapsed += dt
+        self.tick += 1
+        if self.events is not None:
+            self.events.commit()
+        if self.diagnostics is not None:
+            self.diagnostics.sample(self)
+
+    def _step_lod(self, dt):
+        """细节层次步进：近处物体每步更新，其余物体每步只更新索引连续的一段"""
+        n = self.count
+        target = self.time_elapsed + dt
+        if self.contact_solver is not None:
+            # 接触求解需要相互接触的物体在同一次求解中，按编号分段的后台批次在空间上是随机的，
+            # 跨批次的接触没有一方会处理，堆积会塌陷；挂了接触求解器时所有物体每步一起更新
+            # （落后的物体按各自的步长补齐），细节层次不起作用
+            self._advance(slice(0, n), target)
+            return
+        if self._near is None or self._lod_tick >= self.lod_interval:
+            # 重新划分近处物体，落后的时间记录在 last_update 中，划分随时可以改变；
+            # 后台轮转的位置 _lod_cursor 不随划分重置
+            self._near = self.bodies_in_rect(*self.lod_view)
+            self._partition_count = n
+            self._lod_tick = 0
+        near = self._near
+        if n > self._partition_count:
+            # 划分之后新加入的物体按近处物体处理
+            near = np.concatenate([near, np.arange(self._partition_count, n)])
+        if self.soft_bodies is not None and len(self.soft_bodies):
+            # 软体质点总是和近处物体一起更新：同一软体的质点拆到不同批次、用不同步长补步时
+            # 弹簧两端不同步，网格会被拉乱
+            near = np.union1d(near, self.soft_bodies.particles())
+        for field in self.force_fields:
+            # 弹簧等耦合力场的物体同理，两端各自补步时力按过时的位置计算
+            coupled = field.coupled_bodies() if field.enabled else None
+            if coupled is not None:
+                near = np.union1d(near, coupled)
+        self._advance(near, target)
+        # 后台更新用连续切片而不是索引数组，避免 gather/scatter；
+        # 段内的近处物体已经推进到 target，步长为 0，不会被重复积分。
+        # 每段 ceil(n / lod_interval) 个，扫完一遍最多 lod_interval 步；物体数变化时游标照常前进
+        chunk = -(-n // self.lod_interval)
+        start = self._lod_cursor if self._lod_cursor < n else 0
+        self._advance(slice(start, min(n, start + chunk)), target)
+        self._lod_cursor = start + chunk
+        self._lod_tick += 1
+
+    def _advance(self, index, target, dt=None):
+        """把 index 对应的物体推进到时刻 target：累加力 -> 速度积分 -> 软体弹簧 -> 接触求解 -> 位置积分 -> 碰撞
+
+        dt 为 None 时按每个物体的 last_update 计算各自的步长（数组）。
+        """
+        if dt is None:
+            dt = (target - self.last_update[index]).astype(self.dtype)[:, None]
+        if self.last_update is not None:
+            self.last_update[index] = target
+        self._event_time = target
+        self.accumulate_forces(index)
+        # 先更新速度再更新位置（半隐式欧拉）。index 是切片时 force/vel 都是视图，
+        # 原地运算，力数组顺便作为 v * dt 的临时缓冲区，不分配 (n, 2) 的中间数组
+        force = self.force[index]
+        force *= self.inv_mass[index][:, None]
+        force *= dt
+        vel = self.vel[index]
+        vel += force
+        if self.soft_bodies is not None:
+            self.soft_bodies.solve(self, index, vel, dt)
+        correction = None
+        if self.contact_solver is not None:
+            correction = self.contact_solver.solve(self, index, self.pos[index], vel, dt)
+        if not isinstance(index, slice):
+            self.vel[index] = vel
+        np.multiply(vel, dt, out=force)
+        if correction is not None:
+            correction *= dt
+            force += correction
+        self.pos[index] += force
+        if self.contact_solver is None:
+            self._resolve_bounds(index)
+            if self.static_geometry is not None:
+                self.static_geometry.collide(self, index)
+        if self.events is not None:
+            self._update_rest(index)
+
+    @staticmethod
+    def _rows(index, mask):
+        """index 中满足 mask 的物体的全局索引；index 是切片时不需要先展开成索引数组"""
+        if isinstance(index, slice):
+            return np.flatnonzero(mask) + index.start
+        return index[mask]
+
+    def _update_rest(self, index):
+        """静止检测，物体静止或重新运动时记录 REST / WAKE 事件"""
+        vel = self.vel[index]
+        slow = vel[:, 0] * vel[:, 0] + vel[:, 1] * vel[:, 1] < REST_VELOCITY * REST_VELOCITY
+        still = np.where(slow, np.minimum(self.still_steps[index], REST_STEPS) + 1, 0)
+        self.still_steps[index] = still
+        resting = still >= REST_STEPS
+        flags = self.flags[index]
+        was_resting = (flags & RESTING).astype(bool)
+        self.flags[index] = np.where(resting, flags | RESTING, flags & (0xFF ^ RESTING))
+        for kind, changed in ((REST, resting & ~was_resting), (WAKE, was_resting & ~resting)):
+            bodies = self._rows(index, changed)
+            if len(bodies):
+                speed = np.hypot(self.vel[bodies, 0], self.vel[bodies, 1])
+                self.events.emit_many(kind, bodies, self._event_time, speed, self.pos[bodies])
+
+    def _resolve_bounds(self, index):
+        """地面与左右墙的碰撞检测与反弹"""
+        pos = self.pos[index]
+        radius = self.radius[index]
+
+        # 地面
+        hit = self._rows(index, pos[:, 1] < radius)
+        if len(hit):
+            vy = self.vel[hit, 1]
+            self.pos[hit, 1] = self.radius[hit]
+            incoming = np.minimum(vy, 0.0)
+            bounce = -incoming * self.restitution[hit]
+            bounce[bounce < MIN_REBOUND_VELOCITY] = 0.0
+            self.vel[hit, 1] = np.where(vy < 0.0, bounce, vy)
+            # 只统计真正的撞击，静止接触不计入反弹次数
+            impact = incoming < -MIN_REBOUND_VELOCITY
+            self.rebound_count[hit] += impact
+            if impact.any():
+                self._record_impacts(CONTACT, hit[impact], -incoming[impact], bounce[impact])
+
+        # 左墙
+        hit = self._rows(index, pos[:, 0] < radius)
+        if len(hit):
+            vx = self.vel[hit, 0]
+            self.pos[hit, 0] = self.radius[hit]
+            self.vel[hit, 0] = np.abs(vx) * self.restitution[hit]
+            self._wall_impacts(hit, -vx)
+
+        # 右墙
+        hit = self._rows(index, pos[:, 0] > self.width - radius)
+        if len(hit):
+            vx = self.vel[hit, 0]
+            self.pos[hit, 0] = self.width - self.radius[hit]
+            self.vel[hit, 0] = -np.abs(vx) * self.restitution[hit]
+            self._wall_impacts(hit, vx)
+
+    def _wall_impacts(self, hit, speed):
+        """speed 为朝墙方向的速度分量，大于阈值的才算撞击"""
+        if self.events is None and self.diagnostics is None:
+            return
+        impact = speed > MIN_REBOUND_VELOCITY
+        if impact.any():
+            bodies = hit[impact]
+            self._record_impacts(WALL, bodies, speed[impact], np.abs(self.vel[bodies, 0]))
+
+    def _record_impacts(self, kind, bodies, speed_in, speed_out):
+        """把一批撞击交给事件流和诊断"""
+        if self.events is not None:
+            self.events.emit_many(kind, bodies, self._event_time, speed_in, self.pos[bodies])
+        if self.diagnostics is not None:
+            self.diagnostics.record_impacts(self.mass[bodies], speed_in, speed_out)